@@ -0,0 +1,38 @@
+"""store refresh tokens as sha256 digests
+
+Revision ID: 5b0e2f7a9c41
+Revises: c844e51c5741
+Create Date: 2026-10-17 09:10:12.418203+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b0e2f7a9c41'
+down_revision: Union[str, Sequence[str], None] = 'c844e51c5741'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("refresh_tokens", sa.Column("token_hash", sa.String(length=64), nullable=True))
+    # Backfill with the same digest the app computes (hashlib.sha256(...).hexdigest())
+    op.execute("UPDATE refresh_tokens SET token_hash = encode(digest(token, 'sha256'), 'hex')")
+    op.alter_column("refresh_tokens", "token_hash", nullable=False)
+    op.create_index("ix_refresh_tokens_token_hash", "refresh_tokens", ["token_hash"], unique=True)
+    op.execute("DROP INDEX IF EXISTS ix_refresh_tokens_token")
+    op.drop_column("refresh_tokens", "token")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Raw tokens cannot be recovered from their digests: existing sessions are revoked
+    op.execute("DELETE FROM refresh_tokens")
+    op.add_column("refresh_tokens", sa.Column("token", sa.String(length=512), nullable=False))
+    op.drop_index("ix_refresh_tokens_token_hash", table_name="refresh_tokens")
+    op.drop_column("refresh_tokens", "token_hash")
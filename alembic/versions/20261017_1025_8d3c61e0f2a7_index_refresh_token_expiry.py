@@ -0,0 +1,37 @@
+"""index refresh_tokens.expires_at for the expiry sweeper
+
+Revision ID: 8d3c61e0f2a7
+Revises: 5b0e2f7a9c41
+Create Date: 2026-10-17 10:25:47.902114+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3c61e0f2a7'
+down_revision: Union[str, Sequence[str], None] = '5b0e2f7a9c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_refresh_tokens_expires_at", table_name="refresh_tokens",
+            postgresql_concurrently=True, if_exists=True,
+        )
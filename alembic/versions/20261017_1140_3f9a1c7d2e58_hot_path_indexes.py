@@ -0,0 +1,59 @@
+"""composite and partial indexes for the hot read paths
+
+Revision ID: 3f9a1c7d2e58
+Revises: 8d3c61e0f2a7
+Create Date: 2026-10-17 11:40:03.551870+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2e58'
+down_revision: Union[str, Sequence[str], None] = '8d3c61e0f2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, extra create_index kwargs)
+INDEXES = [
+    # get_my_notifications: WHERE user_id = ? ORDER BY created_at DESC
+    ("ix_notifications_user_id_created_at", "notifications",
+     ["user_id", sa.text("created_at DESC")], {}),
+    # overdue_tasks: WHERE project_id = ? AND due_date < now() AND status <> 'done'
+    ("ix_tasks_project_id_due_date_open", "tasks",
+     ["project_id", "due_date"], {"postgresql_where": sa.text("status <> 'done'")}),
+    # get_task_comments: WHERE task_id = ? ORDER BY created_at
+    ("ix_task_comments_task_id_created_at", "task_comments", ["task_id", "created_at"], {}),
+    ("ix_tasks_assignee_id", "tasks", ["assignee_id"], {}),
+    # the primary key (project_id, user_id) cannot serve lookups by user
+    ("ix_project_members_user_id", "project_members", ["user_id"], {}),
+]
+
+# Single-column indexes that are now prefixes of the composite ones above
+SUPERSEDED = [
+    ("ix_notifications_user_id", "notifications", ["user_id"]),
+    ("ix_task_comments_task_id", "task_comments", ["task_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+        for name, table, _ in SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in SUPERSEDED:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
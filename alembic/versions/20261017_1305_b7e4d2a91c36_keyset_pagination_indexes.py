@@ -0,0 +1,44 @@
+"""indexes backing keyset pagination of list endpoints
+
+Revision ID: b7e4d2a91c36
+Revises: 3f9a1c7d2e58
+Create Date: 2026-10-17 13:05:41.207396+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d2a91c36'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7d2e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Lists are filtered by their parent and ordered by (created_at, id)
+INDEXES = [
+    ("ix_tasks_project_id_created_at_id", "tasks", ["project_id", "created_at", "id"]),
+    ("ix_projects_organization_id_created_at_id", "projects", ["organization_id", "created_at", "id"]),
+    ("ix_users_organization_id_created_at_id", "users", ["organization_id", "created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        # prefix of ix_tasks_project_id_created_at_id
+        op.drop_index("ix_tasks_project_id", table_name="tasks", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index("ix_tasks_project_id", "tasks", ["project_id"], postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""per-project task status counters
+
+Revision ID: e2c85f4b1a07
+Revises: b7e4d2a91c36
+Create Date: 2026-10-17 14:20:16.730485+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c85f4b1a07'
+down_revision: Union[str, Sequence[str], None] = 'b7e4d2a91c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'project_task_counters',
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', postgresql.ENUM('todo', 'in_progress', 'done', name='taskstatus', create_type=False), nullable=False),
+        sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id', 'status'),
+    )
+    # Backfill from existing tasks
+    op.execute(
+        "INSERT INTO project_task_counters (project_id, status, count) "
+        "SELECT project_id, status, count(*) FROM tasks GROUP BY project_id, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('project_task_counters')
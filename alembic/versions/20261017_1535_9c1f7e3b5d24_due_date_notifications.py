@@ -0,0 +1,110 @@
+"""track due-soon / overdue notifications on tasks
+
+Revision ID: 9c1f7e3b5d24
+Revises: e2c85f4b1a07
+Create Date: 2026-10-17 15:35:22.094518+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f7e3b5d24'
+down_revision: Union[str, Sequence[str], None] = 'e2c85f4b1a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, columns before due_date, predicate)
+PENDING_INDEXES = [
+    ("ix_tasks_due_date_due_soon_pending", [], "status <> 'done' AND due_soon_notified_at IS NULL"),
+    ("ix_tasks_due_date_overdue_pending", [], "status <> 'done' AND overdue_notified_at IS NULL"),
+]
+# Created on due_date by 3f9a1c7d2e58; rebuilt on the replacement column
+OPEN_INDEX = ("ix_tasks_project_id_due_date_open", ["project_id"], "status <> 'done'")
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def _replace_due_date(column_type: str, cast: str, indexes) -> None:
+    """Replace tasks.due_date with a `column_type` column without rewriting the table under lock.
+
+    The new column is added empty (metadata only), kept in sync with due_date by
+    a trigger, backfilled in primary-key batches that each commit on their own,
+    and indexed concurrently. Only the final swap takes the ACCESS EXCLUSIVE
+    lock, and it is made of catalog-only renames and drops. Every step is
+    idempotent, so a migration interrupted midway can be rerun.
+    """
+    op.execute(f"ALTER TABLE tasks ADD COLUMN IF NOT EXISTS due_date_new {column_type}")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION tasks_sync_due_date_new() RETURNS trigger AS $$
+        BEGIN
+            NEW.due_date_new := {cast.format("NEW.due_date")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS tasks_sync_due_date_new ON tasks")
+    op.execute(
+        "CREATE TRIGGER tasks_sync_due_date_new BEFORE INSERT OR UPDATE OF due_date ON tasks "
+        "FOR EACH ROW EXECUTE FUNCTION tasks_sync_due_date_new()"
+    )
+
+    # Each statement commits on its own: row locks are held for one batch only
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after = None
+        while True:
+            after = bind.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT id FROM tasks
+                    WHERE CAST(:after AS uuid) IS NULL OR id > CAST(:after AS uuid)
+                    ORDER BY id LIMIT :batch_size
+                ), updated AS (
+                    UPDATE tasks SET due_date_new = {cast.format("tasks.due_date")}
+                    FROM batch WHERE tasks.id = batch.id
+                    RETURNING tasks.id
+                )
+                -- no max(uuid) before PostgreSQL 16; text order is the same
+                SELECT max(id::text) FROM updated
+            """), {"after": after, "batch_size": BACKFILL_BATCH_SIZE}).scalar()
+            if after is None:
+                break
+
+        for name, columns, where in indexes:
+            op.create_index(
+                f"{name}_new", "tasks", [*columns, "due_date_new"],
+                postgresql_where=sa.text(where), postgresql_concurrently=True, if_not_exists=True,
+            )
+
+    # The swap: catalog changes only, so the exclusive lock is brief
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("DROP TRIGGER tasks_sync_due_date_new ON tasks")
+    op.execute("DROP FUNCTION tasks_sync_due_date_new()")
+    op.execute("ALTER TABLE tasks DROP COLUMN due_date")
+    op.execute("ALTER TABLE tasks RENAME COLUMN due_date_new TO due_date")
+    for name, _, _ in indexes:
+        op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS due_soon_notified_at timestamptz")
+    op.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS overdue_notified_at timestamptz")
+    # due_date was created as DATE while the model and API use timestamptz: comparing
+    # it with timestamptz bounds casts the column and defeats its indexes.
+    # ALTER COLUMN ... TYPE would rewrite the whole table under an exclusive lock.
+    _replace_due_date("timestamptz", "({}::timestamp AT TIME ZONE 'UTC')", [OPEN_INDEX, *PENDING_INDEXES])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in PENDING_INDEXES:
+            op.drop_index(name, table_name="tasks", postgresql_concurrently=True, if_exists=True)
+    _replace_due_date("date", "(({}) AT TIME ZONE 'UTC')::date", [OPEN_INDEX])
+    op.drop_column("tasks", "overdue_notified_at")
+    op.drop_column("tasks", "due_soon_notified_at")
@@ -0,0 +1,37 @@
+"""partial index on unread notifications
+
+Revision ID: 4a7d93e0c1b8
+Revises: 9c1f7e3b5d24
+Create Date: 2026-10-17 17:10:48.512306+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7d93e0c1b8'
+down_revision: Union[str, Sequence[str], None] = '9c1f7e3b5d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notifications_user_id_unread", "notifications", ["user_id"],
+            postgresql_where=sa.text("is_read = false"), postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_notifications_user_id_unread", table_name="notifications",
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,57 @@
+"""notification retention
+
+Revision ID: 7e5b2a9f1c36
+Revises: d61b0c8e4f93
+Create Date: 2026-10-17 20:40:12.504318+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e5b2a9f1c36'
+down_revision: Union[str, Sequence[str], None] = 'd61b0c8e4f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Monthly partitions are created by the retention job before it archives
+    op.create_table(
+        'notification_archive',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('type', postgresql.ENUM(name='notificationtype', create_type=False), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'archived_at'),
+        postgresql_partition_by='RANGE (archived_at)',
+    )
+    op.create_index('ix_notification_archive_user_id', 'notification_archive', ['user_id'])
+
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notifications_created_at', 'notifications', ['created_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_notifications_created_at', table_name='notifications',
+            postgresql_concurrently=True, if_exists=True,
+        )
+    # drops the partitions too
+    op.drop_table('notification_archive')
@@ -0,0 +1,107 @@
+"""Process pool for bcrypt so hashing never runs on the request threads.
+
+bcrypt holds the GIL for tens of milliseconds per call; running it in worker
+processes lets hashing scale with cores while the API keeps serving other
+requests. Work beyond `workers + queue_size` in flight is rejected with
+HashingQueueFull instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from app.core.security import hash_password, verify_password
+from config import settings
+
+
+class HashingQueueFull(RuntimeError):
+    """Raised when the password hashing queue is at capacity."""
+
+
+def _timed_call(fn, submitted_at: float, *args):
+    # Runs in the worker process; report how long the job sat in the queue
+    waited = time.time() - submitted_at
+    return fn(*args), waited
+
+
+class PasswordHasher:
+    def __init__(self, max_workers: int, queue_size: int):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = self.max_workers + queue_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def start(self) -> ProcessPoolExecutor:
+        """Start the pool if needed and return it."""
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def shutdown(self, pool: Optional[ProcessPoolExecutor] = None) -> None:
+        """Shut the pool down; with `pool`, only if it is still the current one."""
+        with self._lock:
+            if pool is not None and pool is not self._pool:
+                return
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn, *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingQueueFull("Password hashing queue is full")
+            self._pending += 1
+        try:
+            # Never None: run_in_executor(None, ...) would run bcrypt on the loop's default
+            # threads. A shutdown() racing this call makes the submission fail instead.
+            pool = self.start()
+            loop = asyncio.get_running_loop()
+            result, waited = await loop.run_in_executor(pool, _timed_call, fn, time.time(), *args)
+        except BrokenProcessPool:
+            # A worker died; drop the pool so the next call starts a fresh one
+            self.shutdown(pool)
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": round(self.queue_wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+                "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+            }
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_queue_size)
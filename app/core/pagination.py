@@ -0,0 +1,71 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered by (created_at, id), which is stable and unique. The cursor
+is the opaque, URL-safe encoding of the last row's key; the next page starts
+strictly after it, so each page is an index range scan of `limit` rows no
+matter how deep the client pages.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Query
+from sqlalchemy import Select, tuple_
+
+from config import settings
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str]
+    limit: int
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="`next` value from the previous page"),
+    limit: int = Query(settings.pagination_default_limit, ge=1, le=settings.pagination_max_limit),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=limit)
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(stmt: Select, params: PageParams, created_at_col, id_col, descending: bool = False) -> Select:
+    """Restrict `stmt` to the page after `params.cursor`, fetching one extra row to detect a next page."""
+    if params.cursor:
+        key = tuple_(created_at_col, id_col)
+        after = tuple_(*decode_cursor(params.cursor))
+        stmt = stmt.where(key < after if descending else key > after)
+    if descending:
+        stmt = stmt.order_by(created_at_col.desc(), id_col.desc())
+    else:
+        stmt = stmt.order_by(created_at_col.asc(), id_col.asc())
+    return stmt.limit(params.limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any],
+    params: PageParams,
+    key: Callable[[Any], Tuple[datetime, UUID]] = lambda row: (row.created_at, row.id),
+) -> Tuple[List[Any], Optional[str]]:
+    """Return the page's rows and the cursor for the next page (None when this is the last)."""
+    rows = list(rows)
+    if len(rows) <= params.limit:
+        return rows, None
+    rows = rows[:params.limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,141 @@
+"""Cache of authenticated users so get_current_user can skip the users lookup.
+
+Snapshots of the User row are kept in process (bounded, short TTL) and, when
+`principal_cache_use_redis` is enabled, in Redis so other workers share them.
+Entries are dropped after any committed update or delete of the user, which
+covers deactivation, role/organization changes and `delete_user_in_org`.
+Bulk `query(...).update()` calls bypass the ORM events and must call
+`invalidate_principal` themselves.
+"""
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.redis import get_async_redis, log_redis_error, run_pipeline
+from app.models import User
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_local = TTLCache(settings.principal_cache_max_entries, settings.principal_cache_ttl_seconds)
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+# Columns kept in snapshots; credentials (hash_password) are never cached
+_SNAPSHOT_FIELDS = (
+    "id", "email", "full_name", "gender", "role", "is_active", "organization_id", "created_at", "updated_at",
+)
+
+
+def _key(user_id) -> str:
+    return f"principal:{user_id}"
+
+
+def _encode(value: Any):
+    if isinstance(value, uuid.UUID):
+        return {"__uuid__": str(value)}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]):
+    if "__uuid__" in obj:
+        return uuid.UUID(obj["__uuid__"])
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    return {field: getattr(user, field) for field in _SNAPSHOT_FIELDS}
+
+
+async def _redis_get(user_id) -> Optional[Dict[str, Any]]:
+    try:
+        raw = await get_async_redis().get(_key(user_id))
+    except Exception:
+        _redis_stats["errors"] += 1
+        log_redis_error(logger, "principal cache: redis get failed")
+        return None
+    if raw is None:
+        _redis_stats["misses"] += 1
+        return None
+    _redis_stats["hits"] += 1
+    return json.loads(raw, object_hook=_decode)
+
+
+async def _redis_set(user_id, snapshot: Dict[str, Any]) -> None:
+    try:
+        await get_async_redis().setex(_key(user_id), settings.principal_cache_ttl_seconds, json.dumps(snapshot, default=_encode))
+    except Exception:
+        _redis_stats["errors"] += 1
+        log_redis_error(logger, "principal cache: redis set failed")
+
+
+async def _attach(db: AsyncSession, snapshot: Dict[str, Any]) -> User:
+    # Rebuild the row as a detached instance and attach it without a SELECT;
+    # columns left out of the snapshot stay unloaded
+    user = User(**{field: snapshot[field] for field in _SNAPSHOT_FIELDS if field in snapshot})
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def load_principal(db: AsyncSession, user_id) -> Optional[User]:
+    """Return the user for `user_id`, attached to `db`, using the cache first."""
+    key = str(user_id)
+    snapshot = _local.get(key)
+    if snapshot is None and settings.principal_cache_use_redis:
+        snapshot = await _redis_get(key)
+        if snapshot is not None:
+            _local.set(key, snapshot)
+    if snapshot is not None:
+        return await _attach(db, dict(snapshot))
+
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if user is not None:
+        snapshot = _snapshot(user)
+        _local.set(key, snapshot)
+        if settings.principal_cache_use_redis:
+            await _redis_set(key, snapshot)
+    return user
+
+
+def invalidate_principal(user_id) -> None:
+    key = str(user_id)
+    _local.delete(key)
+    if settings.principal_cache_use_redis:
+        run_pipeline(lambda pipe: pipe.delete(_key(key)), _redis_delete_failed)
+
+
+def _redis_delete_failed() -> None:
+    _redis_stats["errors"] += 1
+    log_redis_error(logger, "principal cache: redis delete failed")
+
+
+def principal_cache_stats() -> Dict[str, Any]:
+    return {"local": _local.stats(), "redis": dict(_redis_stats, enabled=settings.principal_cache_use_redis)}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = [obj for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)]
+    if changed:
+        session.info.setdefault("principal_invalidations", set()).update(str(u.id) for u in changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop("principal_invalidations", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("principal_invalidations", None)
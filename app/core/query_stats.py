@@ -0,0 +1,112 @@
+"""Per-request SQL statement counting, timing and N+1 detection.
+
+Engines passed to `instrument_engine` report every cursor execution to the
+QueryStats of the current request (a context variable set by `track_queries`).
+Statements outside a tracked request cost one context-variable lookup.
+
+`count_queries` / `assert_max_queries` count every statement on the
+instrumented engines regardless of context, so tests can bound the queries an
+endpoint issues through TestClient, which runs the app on another thread:
+
+    with assert_max_queries(3):
+        client.get(f"/tasks/{task_id}", headers=auth)
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+_global_counters: List["QueryStats"] = []
+_global_lock = threading.Lock()
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.statements[statement] += 1
+
+    @property
+    def total_ms(self) -> float:
+        return round(self.total_time * 1000, 3)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times (likely N+1 loads)."""
+        with self._lock:
+            return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None and not _global_counters:
+        return
+    elapsed = time.perf_counter() - context._query_stats_start
+    if stats is not None:
+        stats.record(statement, elapsed)
+    with _global_lock:
+        for counter in _global_counters:
+            counter.record(statement, elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the statement listeners to a sync Engine (use AsyncEngine.sync_engine for async ones)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements issued in this context (and tasks/threads spawned from it)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def report_repeated(stats: QueryStats, threshold: int, where: str) -> None:
+    for statement, times in stats.repeated(threshold):
+        logger.warning("possible N+1 in %s: statement ran %d times: %s", where, times, " ".join(statement.split()))
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count every statement on the instrumented engines while the block runs."""
+    stats = QueryStats()
+    with _global_lock:
+        _global_counters.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global_counters.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statements = "\n".join(f"  {n}x {' '.join(sql.split())}" for sql, n in stats.statements.most_common())
+        raise AssertionError(f"expected at most {limit} queries, got {stats.count}:\n{statements}")
@@ -0,0 +1,316 @@
+"""Shared Redis clients with short timeouts and a circuit breaker.
+
+Redis only backs caches and counters here, so it must never hold a request
+up. Both clients share connection pools configured from Settings and go
+through one CircuitBreaker. After `redis_breaker_failure_threshold`
+consecutive connection errors or timeouts the breaker opens. Calls then fail
+immediately with RedisUnavailable and callers fall back to Postgres. After
+`redis_breaker_reset_seconds` a single trial call is let through, and other
+calls are refused until it reports back: its success closes the breaker, its
+failure opens it again. Pub/sub connections are long-lived and bypass the
+breaker.
+
+Code on the event loop must use the asyncio client. Session after_commit
+hooks fire on the loop thread for AsyncSession commits and in worker threads
+for the batch jobs. They queue their writes through `run_pipeline`, which
+picks the right client.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Set
+
+import redis
+import redis.asyncio
+from redis.exceptions import ConnectionError, TimeoutError
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisUnavailable(ConnectionError):
+    """Raised instead of calling Redis while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self.state = "half_open"
+                logger.info("redis circuit breaker half-open, trying redis again")
+            # Half-open: one trial call at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release_trial(self) -> None:
+        """End a call that says nothing about Redis (e.g. cancelled) without changing the state."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            if self.state != "closed":
+                logger.info("redis circuit breaker closed")
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._times_opened += 1
+                logger.warning("redis circuit breaker open for %.1fs after %d failures", self.reset_seconds, self._failures)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self._failures, "times_opened": self._times_opened}
+
+
+class RedisMetrics:
+    BUCKETS_MS = (1, 5, 25, 100)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(self.BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float, failed: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.errors += failed
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            index = next((i for i, bound in enumerate(self.BUCKETS_MS) if elapsed_ms < bound), len(self.BUCKETS_MS))
+            self.buckets[index] += 1
+
+    def reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def stats(self) -> Dict[str, Any]:
+        labels = [f"<{bound}ms" for bound in self.BUCKETS_MS] + [f">={self.BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "latency": dict(zip(labels, self.buckets)),
+        }
+
+
+breaker = CircuitBreaker(settings.redis_breaker_failure_threshold, settings.redis_breaker_reset_seconds)
+metrics = RedisMetrics()
+
+# Failures that say something about Redis availability; a ResponseError means it answered
+_FAILURES = (ConnectionError, TimeoutError, OSError)
+# Methods that only build objects locally
+_PASSTHROUGH = {"pubsub", "register_script", "connection_pool"}
+
+
+def _finish(started: float, failed: bool) -> None:
+    metrics.observe((time.perf_counter() - started) * 1000, failed)
+    if failed:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+@contextmanager
+def _guarded():
+    """Time one Redis call and report its outcome to the breaker."""
+    if not breaker.allow():
+        metrics.reject()
+        raise RedisUnavailable("redis circuit breaker is open")
+    started = time.perf_counter()
+    try:
+        yield
+    except _FAILURES:
+        _finish(started, True)
+        raise
+    except Exception:
+        # e.g. a ResponseError: Redis answered
+        _finish(started, False)
+        raise
+    except BaseException:
+        breaker.release_trial()
+        raise
+    _finish(started, False)
+
+
+class _GuardedPipeline:
+    def __init__(self, pipeline):
+        self._pipeline = pipeline
+
+    def __getattr__(self, name):
+        return getattr(self._pipeline, name)
+
+    def execute(self, *args, **kwargs):
+        with _guarded():
+            return self._pipeline.execute(*args, **kwargs)
+
+
+class _AsyncGuardedPipeline(_GuardedPipeline):
+    async def execute(self, *args, **kwargs):
+        with _guarded():
+            return await self._pipeline.execute(*args, **kwargs)
+
+
+class GuardedRedis:
+    """Proxy of redis.Redis whose commands are timed and go through the breaker."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in _PASSTHROUGH or not callable(attr):
+            return attr
+        if name == "pipeline":
+            return lambda *args, **kwargs: _GuardedPipeline(attr(*args, **kwargs))
+
+        def command(*args, **kwargs):
+            with _guarded():
+                return attr(*args, **kwargs)
+        return command
+
+
+class AsyncGuardedRedis(GuardedRedis):
+    """asyncio counterpart of GuardedRedis."""
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in _PASSTHROUGH or not callable(attr):
+            return attr
+        if name == "pipeline":
+            return lambda *args, **kwargs: _AsyncGuardedPipeline(attr(*args, **kwargs))
+
+        async def command(*args, **kwargs):
+            with _guarded():
+                return await attr(*args, **kwargs)
+        return command
+
+
+def _pool_options() -> Dict[str, Any]:
+    return dict(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        password=settings.redis_password,
+        db=settings.redis_db,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+        socket_timeout=settings.redis_socket_timeout_seconds,
+        socket_connect_timeout=settings.redis_connect_timeout_seconds,
+        health_check_interval=settings.redis_health_check_interval_seconds,
+    )
+
+
+_client: Optional[GuardedRedis] = None
+_async_client: Optional[AsyncGuardedRedis] = None
+
+
+def get_redis() -> GuardedRedis:
+    """Shared Redis client configured from Settings (created on first use)."""
+    global _client
+    if _client is None:
+        _client = GuardedRedis(redis.Redis(connection_pool=redis.BlockingConnectionPool(**_pool_options())))
+    return _client
+
+
+def get_async_redis() -> AsyncGuardedRedis:
+    """asyncio counterpart of get_redis, for code running on the event loop."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncGuardedRedis(
+            redis.asyncio.Redis(connection_pool=redis.asyncio.BlockingConnectionPool(**_pool_options()))
+        )
+    return _async_client
+
+
+_pending: Set[asyncio.Task] = set()
+
+
+def run_pipeline(
+    build: Callable[[Any], None],
+    on_error: Callable[[], None],
+    on_success: Optional[Callable[[], None]] = None,
+) -> None:
+    """Send the commands `build(pipe)` queues in one round trip without blocking the event loop.
+
+    On the event loop thread the pipeline runs on the asyncio client in a
+    background task; in worker threads it runs inline on the sync client.
+    `on_error` is called from the except block, so it can use log_redis_error.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is None:
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            build(pipe)
+            pipe.execute()
+        except Exception:
+            on_error()
+        else:
+            if on_success is not None:
+                on_success()
+        return
+
+    async def execute() -> None:
+        try:
+            pipe = get_async_redis().pipeline(transaction=False)
+            build(pipe)
+            await pipe.execute()
+        except Exception:
+            on_error()
+        else:
+            if on_success is not None:
+                on_success()
+
+    task = loop.create_task(execute())
+    # The loop only keeps weak references to tasks
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def log_redis_error(log: logging.Logger, message: str) -> None:
+    """Log a failed Redis call from an except block; calls refused by the open breaker are not logged."""
+    if not isinstance(sys.exc_info()[1], RedisUnavailable):
+        log.warning(message, exc_info=True)
+
+
+def redis_stats() -> Dict[str, Any]:
+    return {"breaker": breaker.stats(), **metrics.stats()}
@@ -0,0 +1,63 @@
+"""Read-replica routing with a read-your-writes window.
+
+Read-only handlers take their session from `get_read_db`, which uses the
+replica unless the caller sent a write request within the last
+`replica_read_your_writes_seconds`. Writes are recorded per user from the
+request method, so this holds for every handler whether it uses the sync or
+async session. The window is tracked in process: with several workers, pin
+clients to a worker or keep the window above the replica lag.
+"""
+from typing import Any, Dict, Optional
+
+from starlette.requests import Request
+
+from app.core.cache import TTLCache
+from app.core.security import decode_token
+from config import settings
+from database import async_replica_engine
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_recent_writers = TTLCache(settings.replica_recent_writers_max_entries, settings.replica_read_your_writes_seconds)
+_routed = {"replica": 0, "primary": 0}
+
+
+def replica_enabled() -> bool:
+    return async_replica_engine is not None
+
+
+def _request_user_id(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).get("sub")
+    except ValueError:
+        return None
+
+
+def record_request(request: Request) -> None:
+    """Open the read-your-writes window if `request` is a write by an authenticated user."""
+    if not replica_enabled() or request.method in SAFE_METHODS:
+        return
+    user_id = _request_user_id(request)
+    if user_id:
+        record_write(user_id)
+
+
+def record_write(user_id) -> None:
+    _recent_writers.set(str(user_id), True)
+
+
+def use_replica(user_id) -> bool:
+    use = replica_enabled() and _recent_writers.get(str(user_id)) is None
+    _routed["replica" if use else "primary"] += 1
+    return use
+
+
+def replica_stats() -> Dict[str, Any]:
+    return {
+        "enabled": replica_enabled(),
+        "routed": dict(_routed),
+        "recent_writers": _recent_writers.stats(),
+    }
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
@@ -7,6 +8,9 @@ from dotenv import load_dotenv
 import jwt as pyjwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
+from config import settings
+
 load_dotenv()
 
 # Config (tốt nhất lấy từ env)
@@ -17,6 +21,9 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Decoded payloads of verified tokens, keyed by token digest and evicted at `exp`
+_token_cache = TTLCache(settings.token_cache_max_entries)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -46,11 +53,27 @@ def create_refresh_token(subject: str) -> str:
     token = pyjwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return token
 
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 def decode_token(token: str) -> Dict:
+    key = token_digest(token)
+    cached = _token_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     try:
         payload = pyjwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except pyjwt.ExpiredSignatureError:
         raise ValueError("Token expired")
     except pyjwt.InvalidTokenError:
         raise ValueError("Invalid token")
+    if "exp" in payload:
+        _token_cache.set(key, payload, expires_at=float(payload["exp"]))
+    return dict(payload)
+
+def revoke_token(token: str) -> None:
+    """Drop a token from the verified-token cache (e.g. on logout)."""
+    _token_cache.delete(token_digest(token))
+
+def token_cache_stats() -> Dict[str, Any]:
+    return _token_cache.stats()
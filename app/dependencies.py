@@ -2,37 +2,34 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from fastapi.security import HTTPAuthorizationCredentials
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_token
-from app.models import User, Project
-from database import SessionLocal 
+from app.core.principal import load_principal
+from app.core.replica import use_replica
+from app.models import User, Task, project_members
+from app.services.membership import check_project_membership
+from database import get_async_db, AsyncReplicaSessionLocal
 from uuid import UUID
 
 
 bearer_scheme = HTTPBearer()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_async_db)):
     token = credentials.credentials
     try:
         payload = decode_token(token)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
-    user_id = payload.get("sub")
-    if not user_id:
+    try:
+        user_id = UUID(payload.get("sub"))
+    except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await load_principal(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if not user.is_active:
@@ -40,12 +37,27 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
     return user
 
 
-def require_project_access(project_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+async def get_read_db(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Session for read-only handlers: the replica, unless the caller wrote recently.
+
+    Authorization still runs on the primary session of get_current_user /
+    require_project_access; use this one only for the handler's own queries.
+    Without a replica (or within the read-your-writes window) it is that same
+    primary session, so the request holds a single primary connection.
+    """
+    if not use_replica(current_user.id):
+        yield db
+        return
+    async with AsyncReplicaSessionLocal() as replica_db:
+        yield replica_db
+
+
+async def require_project_access(project_id: UUID, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    is_member = await check_project_membership(db, project_id, current_user.id)
+    if is_member is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if current_user.id not in [m.id for m in project.members]:
+    if not is_member:
         raise HTTPException(status_code=403, detail="Not authorized for this project")
 
     if current_user.role in ["admin", "manager"]:
@@ -54,3 +66,21 @@ def require_project_access(project_id: UUID, db: Session = Depends(get_db), curr
     return current_user
 
 
+async def get_task_for_user(task_id: UUID, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """Load a task and authorize the caller against its project in one query."""
+    is_member = (
+        exists()
+        .where(
+            project_members.c.project_id == Task.project_id,
+            project_members.c.user_id == current_user.id,
+        )
+        .label("is_member")
+    )
+    row = (await db.execute(select(Task, is_member).where(Task.id == task_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    task, allowed = row
+    if not allowed:
+        raise HTTPException(status_code=403, detail="Not authorized for this project")
+    return task
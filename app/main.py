@@ -1,5 +1,19 @@
-from fastapi import FastAPI
-from app.routers import auth, org, prj, task, noti, comment, attachment
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.routers import auth, org, prj, task, noti, comment, attachment, diag
+from app.core.hashing import password_hasher, HashingQueueFull
+from app.core.query_stats import report_repeated, track_queries
+from app.core.replica import record_request
+from app.services.scheduler import run_periodically
+from app.services.due_date_notifier import notify_due_tasks
+from app.services.notification_outbox import drain_notification_outbox
+from app.services.notification_retention import purge_notifications
+from app.services.notification_stream import notification_broker
+from app.services.token_sweeper import sweep_expired_refresh_tokens
+from config import settings
 
 # from fastapi.security import OAuth2PasswordBearer, HTTPBearer
 
@@ -7,11 +21,78 @@ from app.routers import auth, org, prj, task, noti, comment, attachment
 
 # bearer_scheme = HTTPBearer()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    await notification_broker.start()
+    jobs = []
+    if settings.refresh_token_sweep_interval_seconds > 0:
+        jobs.append(asyncio.create_task(run_periodically(
+            "refresh-token-sweep",
+            settings.refresh_token_sweep_interval_seconds,
+            sweep_expired_refresh_tokens,
+        )))
+    if settings.due_date_scan_interval_seconds > 0:
+        jobs.append(asyncio.create_task(run_periodically(
+            "due-date-notifications",
+            settings.due_date_scan_interval_seconds,
+            notify_due_tasks,
+        )))
+    if settings.notification_outbox_drain_interval_seconds > 0:
+        jobs.append(asyncio.create_task(run_periodically(
+            "notification-outbox",
+            settings.notification_outbox_drain_interval_seconds,
+            drain_notification_outbox,
+        )))
+    if settings.notification_retention_interval_seconds > 0:
+        jobs.append(asyncio.create_task(run_periodically(
+            "notification-retention",
+            settings.notification_retention_interval_seconds,
+            purge_notifications,
+        )))
+    yield
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
+    await notification_broker.stop()
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title="TaskApp",
     description="Multi-organization task management backend",
     version="1.0.0",
     docs_url="/docs",      # Swagger UI    
+    lifespan=lifespan,
+    )
+
+
+@app.middleware("http")
+async def track_writes_for_replica_routing(request: Request, call_next):
+    # Recorded before the handler runs so the caller's next read cannot race its own commit
+    record_request(request)
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def record_query_stats(request: Request, call_next):
+    if not settings.sql_stats_enabled:
+        return await call_next(request)
+    with track_queries() as stats:
+        response = await call_next(request)
+    response.headers["X-DB-Query-Count"] = str(stats.count)
+    response.headers["X-DB-Query-Time-Ms"] = str(stats.total_ms)
+    report_repeated(stats, settings.sql_n_plus_one_threshold, f"{request.method} {request.url.path}")
+    return response
+
+
+@app.exception_handler(HashingQueueFull)
+async def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
     )
 
 
@@ -23,5 +104,6 @@ app.include_router(task.router)
 app.include_router(noti.router)
 app.include_router(comment.router)
 app.include_router(attachment.router)
-
+if settings.diagnostics_enabled:
+    app.include_router(diag.router)
 
@@ -1,8 +1,8 @@
 from .base import BaseModel
 from .user import User, UserRole, Gender, RefreshToken
 from .project import Project, project_members
-from .task import Task, TaskComment, TaskAttachment, TaskStatus, TaskPriority
-from .notification import Notification, NotificationType
+from .task import Task, TaskComment, TaskAttachment, TaskStatus, TaskPriority, project_task_counters
+from .notification import Notification, NotificationType, notification_outbox, notification_archive
 from .organization import Organization
 
 # Export all models for easy import
@@ -19,7 +19,10 @@ __all__ = [
     "TaskAttachment", 
     "TaskStatus", 
     "TaskPriority",
+    "project_task_counters",
     "Notification", 
     "NotificationType",
+    "notification_outbox",
+    "notification_archive",
     "Organization"
 ]
\ No newline at end of file
@@ -7,6 +7,9 @@ Base = declarative_base()
 
 class BaseModel(Base):
     __abstract__ = True
+    # Fetch server-generated columns (timestamps) with RETURNING during the flush
+    # instead of a refresh SELECT after commit
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
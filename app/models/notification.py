@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Enum, Text
+from sqlalchemy import Column, BigInteger, Identity, String, ForeignKey, Boolean, DateTime, Enum, Text, Index, PrimaryKeyConstraint, Table, func, text
 from sqlalchemy.orm import relationship
 import enum
 
+from sqlalchemy.dialects.postgresql import UUID
 from .base import BaseModel
 
 class NotificationType(str, enum.Enum):
@@ -13,6 +14,13 @@ class NotificationType(str, enum.Enum):
 
 class Notification(BaseModel):
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at", "user_id", text("created_at DESC")),
+        # unread counts: only unread rows, usually a small fraction of the table
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("is_read = false")),
+        # retention job: oldest rows first
+        Index("ix_notifications_created_at", "created_at"),
+    )
     
     type = Column(
         Enum(NotificationType, name="notificationtype", values_callable=lambda obj: [e.value for e in obj]),
@@ -24,8 +32,8 @@ class Notification(BaseModel):
     is_read = Column(Boolean, default=False, nullable=False)
     
     # Foreign Keys
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="notifications")
@@ -40,4 +48,51 @@ class Notification(BaseModel):
             "message": self.message,
             "is_read": self.is_read,
             "created_at": self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+# Durable queue of notifications to write. Requests append to it in their own
+# transaction; app.services.notification_outbox moves rows to notifications in
+# batches. No foreign keys, so enqueueing touches nothing but this table.
+notification_outbox = Table(
+    'notification_outbox',
+    BaseModel.metadata,
+    Column('id', BigInteger, Identity(), primary_key=True),
+    Column('user_id', UUID(as_uuid=True), nullable=False),
+    Column('task_id', UUID(as_uuid=True), nullable=False),
+    Column(
+        'type',
+        Enum(NotificationType, name="notificationtype", values_callable=lambda obj: [e.value for e in obj]),
+        nullable=False,
+    ),
+    Column('title', String(255), nullable=False),
+    Column('message', Text, nullable=False),
+    # when the event happened; becomes the notification's created_at
+    Column('created_at', DateTime(timezone=True), server_default=func.now(), nullable=False),
+)
+
+
+# Notifications removed from `notifications` by the retention job. Compact (no
+# updated_at, no foreign keys) and range-partitioned by month of archiving, so
+# app.services.notification_retention can drop a whole month at once.
+notification_archive = Table(
+    'notification_archive',
+    BaseModel.metadata,
+    Column('id', UUID(as_uuid=True), nullable=False),
+    Column('user_id', UUID(as_uuid=True), nullable=False),
+    Column('task_id', UUID(as_uuid=True), nullable=False),
+    Column(
+        'type',
+        Enum(NotificationType, name="notificationtype", values_callable=lambda obj: [e.value for e in obj]),
+        nullable=False,
+    ),
+    Column('title', String(255), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('is_read', Boolean, nullable=False),
+    Column('created_at', DateTime(timezone=True), nullable=False),
+    Column('archived_at', DateTime(timezone=True), server_default=func.now(), nullable=False),
+    # the partition key must be part of the primary key
+    PrimaryKeyConstraint('id', 'archived_at'),
+    Index('ix_notification_archive_user_id', 'user_id'),
+    postgresql_partition_by='RANGE (archived_at)',
+)
@@ -1,14 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, Text
+from sqlalchemy import Column, String, ForeignKey, Table, Text, Index
 from sqlalchemy.orm import relationship
 
+from sqlalchemy.dialects.postgresql import UUID
 from .base import BaseModel
 
 # Association table for many-to-many relationship
 project_members = Table(
     'project_members',
     BaseModel.metadata,
-    Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
-    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
+    Column('project_id', UUID(as_uuid=True), ForeignKey('projects.id'), primary_key=True),
+    Column('user_id', UUID(as_uuid=True), ForeignKey('users.id'), primary_key=True),
+    Index('ix_project_members_user_id', 'user_id'),
 
 )
 
@@ -16,12 +18,15 @@ project_members = Table(
 
 class Project(BaseModel):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_organization_id_created_at_id", "organization_id", "created_at", "id"),
+    )
     
     name = Column(String(255), nullable=False)
     description = Column(Text)
     
     # Foreign Keys
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False)
     
     # Relationships
     organization = relationship("Organization", back_populates="projects")
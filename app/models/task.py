@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Date, Text, BigInteger
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Date, Text, BigInteger, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
 import uuid
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, func, Index, text
 
 from .base import BaseModel
 
@@ -19,6 +19,21 @@ class TaskPriority(str, enum.Enum):
 
 class Task(BaseModel):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # keyset pagination of list_tasks
+        Index("ix_tasks_project_id_created_at_id", "project_id", "created_at", "id"),
+        # overdue report: open tasks of a project by due date
+        Index("ix_tasks_project_id_due_date_open", "project_id", "due_date", postgresql_where=text("status <> 'done'")),
+        # due-date notifier: open tasks not yet notified, by due date
+        Index(
+            "ix_tasks_due_date_due_soon_pending", "due_date",
+            postgresql_where=text("status <> 'done' AND due_soon_notified_at IS NULL"),
+        ),
+        Index(
+            "ix_tasks_due_date_overdue_pending", "due_date",
+            postgresql_where=text("status <> 'done' AND overdue_notified_at IS NULL"),
+        ),
+    )
     
     title = Column(String(255), nullable=False)
     description = Column(Text)
@@ -32,11 +47,14 @@ class Task(BaseModel):
         default=TaskPriority.LOW.value,
         nullable=False,
         )
-    due_date = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    due_date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Set by app.services.due_date_notifier once the notification went out
+    due_soon_notified_at = Column(DateTime(timezone=True), nullable=True)
+    overdue_notified_at = Column(DateTime(timezone=True), nullable=True)
     # Foreign Keys
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
-    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    assignee_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Relationships
     project = relationship("Project", back_populates="tasks")
@@ -49,14 +67,31 @@ class Task(BaseModel):
     def __str__(self):
         return f"<Task: {self.title}>"
 
+# Per-project task counts by status, maintained by app.services.task_counters
+# in the same transaction as the task writes
+project_task_counters = Table(
+    'project_task_counters',
+    BaseModel.metadata,
+    Column('project_id', UUID(as_uuid=True), ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    Column(
+        'status',
+        Enum(TaskStatus, name="taskstatus", values_callable=lambda obj: [e.value for e in obj]),
+        primary_key=True,
+    ),
+    Column('count', Integer, nullable=False, server_default='0'),
+)
+
 class TaskComment(BaseModel):
     __tablename__ = "task_comments"
+    __table_args__ = (
+        Index("ix_task_comments_task_id_created_at", "task_id", "created_at"),
+    )
     
     content = Column(Text, nullable=False)
     
     # Foreign Keys
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Relationships
     task = relationship("Task", back_populates="comments")
@@ -75,8 +110,8 @@ class TaskAttachment(BaseModel):
     content_type = Column(String(100))
     
     # Foreign Keys
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
-    upload_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    upload_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Relationships
     task = relationship("Task", back_populates="attachments")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Boolean, DateTime, Text
+from sqlalchemy import Column, String, ForeignKey, Enum, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -19,6 +19,9 @@ class Gender(str, enum.Enum):
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_organization_id_created_at_id", "organization_id", "created_at", "id"),
+    )
     
     email = Column(String(255), unique=True, nullable=False, index=True)
     hash_password = Column(String(255), nullable=False)
@@ -37,7 +40,7 @@ class User(BaseModel):
     is_active = Column(Boolean, default=True, nullable=False)
     
     # Foreign Keys
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id"), nullable=False)
     
     # Relationships
     organization = relationship("Organization", back_populates="users")
@@ -49,9 +52,10 @@ class User(BaseModel):
 
 class RefreshToken(BaseModel):
     __tablename__ = "refresh_tokens"
-    token = Column(Text, nullable=False, unique=True, index=True)
+    # SHA-256 hex digest of the refresh JWT; the raw token is never stored
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default="now()", nullable=False)
     
     def __str__(self):
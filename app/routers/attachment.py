@@ -1,8 +1,9 @@
 # app/routers/task_attachments.py
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import os
 import shutil
@@ -10,9 +11,10 @@ import uuid
 from pathlib import Path
 
 from app.models import TaskAttachment, Task, User
-from app.schemas import TaskAttachmentOut
-from database import get_db
-from app.dependencies import get_current_user, require_project_access
+from app.schemas import TaskAttachmentOut, Page
+from app.core.pagination import PageParams, keyset, page_params, split_page
+from database import get_async_db
+from app.dependencies import get_current_user, get_task_for_user
 from config import settings
 
 router = APIRouter(
@@ -57,21 +59,22 @@ def validate_file(file: UploadFile) -> None:
                 detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
             )
 
+def _save_upload(file: UploadFile, file_path: Path) -> None:
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
 # Upload file attachment
 @router.post("/", response_model=TaskAttachmentOut, status_code=status.HTTP_201_CREATED)
 async def upload_attachment(
-    task_id: UUID,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if task exists
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)
-   
-    existing_count = db.query(TaskAttachment).filter(TaskAttachment.task_id == task_id).count()
+    task_id = task.id
+    existing_count = await db.scalar(
+        select(func.count()).select_from(TaskAttachment).where(TaskAttachment.task_id == task_id)
+    )
     if existing_count > NUMBER_ATTACHMENTS_LIMIT:
         raise HTTPException(
             status_code=400,
@@ -93,8 +96,7 @@ async def upload_attachment(
     
     try:
         # Save file to disk
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(_save_upload, file, file_path)
         
         # Get file size
         file_size = file_path.stat().st_size
@@ -111,8 +113,7 @@ async def upload_attachment(
         )
         
         db.add(attachment)
-        db.commit()
-        db.refresh(attachment)
+        await db.commit()
         
         return attachment
     
@@ -123,89 +124,54 @@ async def upload_attachment(
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
 # Get all attachments for a task
-@router.get("/", response_model=List[UUID])
-def get_task_attachments(
-    task_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/", response_model=Page[UUID])
+async def get_task_attachments(
+    page: PageParams = Depends(page_params),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # Check if task exists
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check if user has access to the project
-    require_project_access(task.project_id, db, current_user)
-
-    attachments = db.query(TaskAttachment).filter(
-        TaskAttachment.task_id == task_id
-    ).order_by(TaskAttachment.created_at.desc()).all()
-    
-    return [a.id for a in attachments]
+    rows = await db.execute(keyset(
+        select(TaskAttachment.id, TaskAttachment.created_at).where(TaskAttachment.task_id == task.id),
+        page, TaskAttachment.created_at, TaskAttachment.id, descending=True,
+    ))
+    rows, next_cursor = split_page(rows.all(), page)
+    return Page(items=[row.id for row in rows], next=next_cursor)
 
 
 # Get detail attachment 
 @router.get("/{attachment_id}", response_model=TaskAttachmentOut)
-def get_attachment(
-    task_id: UUID,
+async def get_attachment(
     attachment_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    require_project_access(task.project_id, db, current_user)
-    
-
     # Check if attachment exists and belongs to the task
-    attachment = db.query(TaskAttachment).filter(
+    attachment = await db.scalar(select(TaskAttachment).where(
         TaskAttachment.id == attachment_id,
-        TaskAttachment.task_id == task_id
-    ).first()
+        TaskAttachment.task_id == task.id
+    ))
     
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
-    
 
-    
-    # Check if user has access to the project
-    # task = attachment.task
-    # # project = task.project
-    # # if current_user.role not in ["admin", "manager"]:
-    # #     member_ids = [m.id for m in project.members]
-    # #     if current_user.id not in member_ids:
-    # #         raise HTTPException(status_code=403, detail="Not authorized to view this attachment")
-    
     return attachment
 
 # Download file attachment
 @router.get("/{attachment_id}/download")
-def download_attachment(
-    task_id: UUID,
+async def download_attachment(
     attachment_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Check if attachment exists and belongs to the task
-    attachment = db.query(TaskAttachment).filter(
+    attachment = await db.scalar(select(TaskAttachment).where(
         TaskAttachment.id == attachment_id,
-        TaskAttachment.task_id == task_id
-    ).first()
+        TaskAttachment.task_id == task.id
+    ))
     
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
     
-    # Check if user has access to the project
-
-    # task = attachment.task
-    # project = task.project
-    # if current_user.role not in ["admin", "manager"]:
-    #     member_ids = [m.id for m in project.members]
-    #     if current_user.id not in member_ids:
-    #         raise HTTPException(status_code=403, detail="Not authorized to download this attachment")
-    
     # Check if file exists on disk
     file_path = Path(attachment.file_path)
     if not file_path.exists():
@@ -219,25 +185,21 @@ def download_attachment(
 
 # Delete attachment
 @router.delete("/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_attachment(
-    task_id: UUID,
+async def delete_attachment(
     attachment_id: UUID,
-    db: Session = Depends(get_db),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Check if attachment exists and belongs to the task
-    attachment = db.query(TaskAttachment).filter(
+    attachment = await db.scalar(select(TaskAttachment).where(
         TaskAttachment.id == attachment_id,
-        TaskAttachment.task_id == task_id
-    ).first()
+        TaskAttachment.task_id == task.id
+    ))
     
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
     
-    # Check if user has access to the project
-    task = db.query(Task).filter(Task.id == task_id).first()
-    require_project_access(task.project_id, db, current_user)
-    
     # Only the uploader or admin/manager can delete
     if attachment.upload_by != current_user.id and current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to delete this attachment")
@@ -252,8 +214,8 @@ def delete_attachment(
             pass
     
     # Delete database record
-    db.delete(attachment)
-    db.commit()
+    await db.delete(attachment)
+    await db.commit()
     
     return None
 
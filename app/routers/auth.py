@@ -1,28 +1,39 @@
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
 from app.models import User, RefreshToken, Organization
+from app.core.hashing import password_hasher
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     create_refresh_token,
+    revoke_token,
+    token_digest,
     REFRESH_TOKEN_EXPIRE_DAYS,
 )
 from app.schemas import TokenOut, RegisterIn, LoginIn, RefreshIn
+from database import get_db
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _find_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
 @router.post("/register", response_model=TokenOut)
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
+async def register(payload: RegisterIn, db: Session = Depends(get_db)):
     #Ensure email is unique
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = await run_in_threadpool(_find_user_by_email, db, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    hashed = await password_hasher.hash(payload.password)
+    return await run_in_threadpool(_register_user, db, payload, hashed)
+
+
+def _register_user(db: Session, payload: RegisterIn, hashed: str) -> TokenOut:
     #Join existing organization or create a new one
     if payload.organization_id:
         organization = (
@@ -43,15 +54,14 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
             name=payload.organization_name, description=payload.organization_desc
         )
         db.add(new_org)
-        db.commit()
-        db.refresh(new_org)
+        db.flush()
         organization = new_org
         role = "admin"
 
     #Create user
     user = User(
         email=payload.email,
-        hash_password=hash_password(payload.password),
+        hash_password=hashed,
         full_name=payload.full_name,
         gender=payload.gender,
         role=role,
@@ -59,15 +69,14 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
         organization_id=organization.id,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
 
     #Issue tokens and persist refresh token
     now_utc = datetime.now(timezone.utc)
     access = create_access_token(subject=str(user.id), data={"role": user.role})
     refresh = create_refresh_token(subject=str(user.id))
     expires_at = now_utc + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    db_token = RefreshToken(token=refresh, user_id=user.id, expires_at=expires_at)
+    db_token = RefreshToken(token_hash=token_digest(refresh), user_id=user.id, expires_at=expires_at)
     db.add(db_token)
     db.commit()
 
@@ -80,9 +89,9 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hash_password):
+async def login(payload: LoginIn, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user_by_email, db, payload.email)
+    if not user or not await password_hasher.verify(payload.password, user.hash_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
@@ -91,16 +100,19 @@ def login(payload: LoginIn, db: Session = Depends(get_db)):
             status_code=status.HTTP_403_FORBIDDEN, detail="User is deactivated"
         )
 
+    return await run_in_threadpool(_start_session, db, user)
+
+
+def _start_session(db: Session, user: User) -> TokenOut:
     # Enforce single-session: revoke all previous refresh tokens for this user
     db.query(RefreshToken).filter(RefreshToken.user_id == user.id).delete()
-    db.commit()
 
     # Issue tokens
     now_utc = datetime.now(timezone.utc)
     access = create_access_token(subject=str(user.id), data={"role": user.role})
     refresh = create_refresh_token(subject=str(user.id))
     expires_at = now_utc + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    db_token = RefreshToken(token=refresh, user_id=user.id, expires_at=expires_at)
+    db_token = RefreshToken(token_hash=token_digest(refresh), user_id=user.id, expires_at=expires_at)
     db.add(db_token)
     db.commit()
 
@@ -138,7 +150,7 @@ def refresh_token(payload: RefreshIn, db: Session = Depends(get_db)):
     #Check refresh token existence and expiration
     db_token = (
         db.query(RefreshToken)
-        .filter(RefreshToken.token == payload.refresh_token)
+        .filter(RefreshToken.token_hash == token_digest(payload.refresh_token))
         .first()
     )
     if not db_token:
@@ -171,12 +183,11 @@ def refresh_token(payload: RefreshIn, db: Session = Depends(get_db)):
 
     #Rotate refresh token
     db.delete(db_token)
-    db.commit()
-
     new_refresh = create_refresh_token(subject=str(user.id))
     new_expires_at = now_utc + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    db.add(RefreshToken(token=new_refresh, user_id=user.id, expires_at=new_expires_at))
+    db.add(RefreshToken(token_hash=token_digest(new_refresh), user_id=user.id, expires_at=new_expires_at))
     db.commit()
+    revoke_token(payload.refresh_token)
 
     #Issue new access token
     access = create_access_token(subject=str(user.id), data={"role": user.role})
@@ -194,10 +205,11 @@ def logout(payload: RefreshIn, db: Session = Depends(get_db)):
     # Revoke given refresh token (idempotent)
     db_token = (
         db.query(RefreshToken)
-        .filter(RefreshToken.token == payload.refresh_token)
+        .filter(RefreshToken.token_hash == token_digest(payload.refresh_token))
         .first()
     )
     if db_token:
         db.delete(db_token)
         db.commit()
+    revoke_token(payload.refresh_token)
     return {"ok": True, "message": "Logged out successfully"}
@@ -1,13 +1,14 @@
 # app/routers/task_comments.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.models import TaskComment, Task, User
-from app.schemas import TaskCommentOut, TaskCommentCreate
-from database import get_db
-from app.dependencies import get_current_user, require_project_access
+from app.schemas import TaskCommentOut, TaskCommentCreate, Page
+from app.core.pagination import PageParams, keyset, page_params, split_page
+from database import get_async_db
+from app.dependencies import get_current_user, get_task_for_user
 from app.services.notification import create_notification
 
 router = APIRouter(
@@ -17,33 +18,25 @@ router = APIRouter(
 
 # Create a comment on a task
 @router.post("/", response_model=TaskCommentOut, status_code=status.HTTP_201_CREATED)
-def create_comment(
-    task_id: UUID,
+async def create_comment(
     payload: TaskCommentCreate,
-    db: Session = Depends(get_db),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Check if task exists
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)
-    
     # Create comment
     comment = TaskComment(
         content=payload.content,
-        task_id=task_id,
+        task_id=task.id,
         user_id=current_user.id
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
     
     # Send notification to task assignee (if not the same user)
     if task.assignee_id and task.assignee_id != current_user.id:
         create_notification(
             db, 
-            task_id, 
+            task.id, 
             task.assignee_id, 
             f"New comment on task '{task.title}' by {current_user.full_name}"
         )
@@ -53,52 +46,41 @@ def create_comment(
         task.created_by != task.assignee_id):
         create_notification(
             db,
-            task_id,
+            task.id,
             task.created_by,
             f"New comment on task '{task.title}' by {current_user.full_name}"
         )
     
+    await db.commit()
     return comment
 
 # Get all comments for a task
-@router.get("/", response_model=List[TaskCommentOut])
-def get_task_comments(
-    task_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/", response_model=Page[TaskCommentOut])
+async def get_task_comments(
+    page: PageParams = Depends(page_params),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    # Check if task exists
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check if user has access to the project
-    require_project_access(task.project_id, db, current_user)
-
-    comments = db.query(TaskComment).filter(
-        TaskComment.task_id == task_id
-    ).order_by(TaskComment.created_at.asc()).all()
-    
-    return comments
+    comments = await db.scalars(keyset(
+        select(TaskComment).where(TaskComment.task_id == task.id),
+        page, TaskComment.created_at, TaskComment.id,
+    ))
+    comments, next_cursor = split_page(comments.all(), page)
+    return Page(items=comments, next=next_cursor)
 
 # Update a comment
 @router.put("/{comment_id}", response_model=TaskCommentOut)
-def update_comment(
-    task_id: UUID,
+async def update_comment(
     comment_id: UUID,
     payload: TaskCommentCreate,  
-    db: Session = Depends(get_db),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    task=db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)
-
-    comment = db.query(TaskComment).filter(
+    comment = await db.scalar(select(TaskComment).where(
         TaskComment.id == comment_id,
-        TaskComment.task_id == task_id
-    ).first()
+        TaskComment.task_id == task.id
+    ))
     
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
@@ -108,28 +90,22 @@ def update_comment(
         raise HTTPException(status_code=403, detail="Not authorized to update this comment")
     
     comment.content = payload.content
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
     
     return comment
 
 # Delete a comment
 @router.delete("/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_comment(
-    task_id: UUID,
+async def delete_comment(
     comment_id: UUID,
-    db: Session = Depends(get_db),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    task=db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)    
-
-    comment = db.query(TaskComment).filter(
+    comment = await db.scalar(select(TaskComment).where(
         TaskComment.id == comment_id,
-        TaskComment.task_id == task_id
-    ).first()
+        TaskComment.task_id == task.id
+    ))
     
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
@@ -140,7 +116,7 @@ def delete_comment(
     if comment.user_id != current_user.id and current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
     
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
     
     return None
\ No newline at end of file
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.hashing import password_hasher
+from app.core.pool import pool_status
+from app.core.principal import principal_cache_stats
+from app.core.redis import redis_stats
+from app.core.replica import replica_stats
+from app.core.security import token_cache_stats
+from app.dependencies import get_current_user
+from app.models import User
+from app.services.membership import membership_cache_stats
+from app.services.notification_cache import notification_cache_stats
+from app.services.notification_outbox import notification_outbox_stats
+from app.services.notification_retention import notification_retention_stats
+from app.services.notification_stream import notification_broker
+from app.services.unread_counter import unread_counter_stats
+from database import POOL_OPTIONS, async_engine, async_replica_engine, engine
+
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only Admin can view diagnostics")
+    return current_user
+
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["Diagnostics"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+def _pool_status(engine) -> dict:
+    return pool_status(engine.pool, POOL_OPTIONS["max_overflow"])
+
+
+@router.get("/pool")
+def get_pool_status():
+    pools = {"sync": _pool_status(engine), "async": _pool_status(async_engine)}
+    if async_replica_engine is not None:
+        pools["async_replica"] = _pool_status(async_replica_engine)
+    return pools
+
+
+@router.get("/metrics")
+def get_metrics():
+    return {
+        "db_pool": _pool_status(engine),
+        "async_db_pool": _pool_status(async_engine),
+        "replica": replica_stats(),
+        "redis": redis_stats(),
+        "principal_cache": principal_cache_stats(),
+        "token_cache": token_cache_stats(),
+        "membership_cache": membership_cache_stats(),
+        "unread_counter": unread_counter_stats(),
+        "notification_cache": notification_cache_stats(),
+        "notification_outbox": notification_outbox_stats(),
+        "notification_retention": notification_retention_stats(),
+        "notification_stream": notification_broker.stats(),
+        "password_hasher": password_hasher.stats(),
+    }
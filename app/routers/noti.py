@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import false, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID
-import json
-import redis
 
 from app.models import Project, User, Task, Notification
-from app.schemas import NotificationOut
-from database import get_db
+from app.schemas import NotificationOut, NotificationIdsIn, NotificationsReadOut, UnreadCountOut, Page
+from app.core.pagination import PageParams, decode_cursor, keyset, page_params, split_page
+from database import AsyncSessionLocal, get_async_db
 from app.dependencies import get_current_user
 from app.services.notification import create_notification
+from app.services.notification_cache import cache_page, get_cached_page, invalidate_notifications
+from app.services.notification_stream import notification_broker, stream_message
+from app.services.unread_counter import record_unread, unread_count
+from config import settings
 
 
 router = APIRouter(
@@ -17,52 +23,144 @@ router = APIRouter(
     tags=["Notifications"]
 )
 
-redis_client = redis.Redis(host="localhost", port=6379, password="redis123", db=0, decode_responses=True)
 
-CACHE_TTL = 60 # seconds
+async def _mark_read(db: AsyncSession, user_id, *criteria) -> NotificationsReadOut:
+    """Mark the user's unread notifications matching `criteria` read in one UPDATE."""
+    ids = (await db.scalars(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == false(), *criteria)
+        .values(is_read=True)
+        .returning(Notification.id),
+        execution_options={"synchronize_session": False},
+    )).all()
+    if ids:
+        record_unread(db, user_id, -len(ids))
+        invalidate_notifications(db, [user_id])
+    await db.commit()
+    return NotificationsReadOut(updated=len(ids), ids=ids)
 
-@router.get("/", response_model=List[NotificationOut])
-def get_my_notifications(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Page[NotificationOut])
+async def get_my_notifications(
+    page: PageParams = Depends(page_params),
+    # Primary, not replica: a page read from a lagging replica would be cached as current
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    cache_key = f"user:{current_user.id}:notifications"
-    cached_data = redis_client.get(cache_key)
+    version, cached = await get_cached_page(current_user.id, page.cursor, page.limit)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-    if cached_data:
-        return [NotificationOut(**notif) for notif in json.loads(cached_data)]
+    notifs = await db.scalars(keyset(
+        select(Notification).where(Notification.user_id == current_user.id),
+        page, Notification.created_at, Notification.id, descending=True,
+    ))
+    notifs, next_cursor = split_page(notifs.all(), page)
+    result = Page[NotificationOut](items=[NotificationOut.model_validate(n, from_attributes=True) for n in notifs], next=next_cursor)
 
-    notifs = (
-        db.query(Notification)
-        .filter(Notification.user_id == current_user.id)
-        .order_by(Notification.created_at.desc())
-        .all()
+    await cache_page(current_user.id, version, page.cursor, page.limit, result.model_dump_json())
+    return result
+
+
+def _sse(message) -> str:
+    return f"id: {message['id']}\ndata: {message['data']}\n\n"
+
+
+async def _event_stream(user_id, last_event_id: Optional[str]):
+    # Subscribe before the replay query so nothing committed in between is missed
+    async with notification_broker.subscribe(user_id) as queue:
+        replayed = set()
+        cursor = last_event_id
+        while cursor:
+            # Page through everything missed; the connection is released between pages
+            params = PageParams(cursor=cursor, limit=settings.pagination_max_limit)
+            async with AsyncSessionLocal() as db:
+                missed = await db.scalars(keyset(
+                    select(Notification).where(Notification.user_id == user_id),
+                    params, Notification.created_at, Notification.id,
+                ))
+                missed, cursor = split_page(missed.all(), params)
+            for notif in missed:
+                replayed.add(str(notif.id))
+                yield _sse(stream_message(notif))
+
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), settings.notification_stream_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                # fell behind; the client reconnects with Last-Event-ID
+                return
+            if message["notification_id"] not in replayed:
+                yield _sse(message)
+
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Server-Sent Events of the user's new notifications; resumes after Last-Event-ID."""
+    if last_event_id:
+        decode_cursor(last_event_id)
+    # The stream can stay open for hours: give the connection back to the pool now
+    await db.close()
+    return StreamingResponse(
+        _event_stream(current_user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    redis_client.setex(cache_key, CACHE_TTL, json.dumps([n.as_dict() for n in notifs]))
-    return notifs
+
+@router.get("/unread-count", response_model=UnreadCountOut)
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    return UnreadCountOut(unread=await unread_count(db, current_user.id))
 
 
 @router.put("/{notif_id}/read", response_model=NotificationOut)
-def mark_as_read(
+async def mark_as_read(
     notif_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    notif = (
-        db.query(Notification)
-        .filter(Notification.id == notif_id, Notification.user_id == current_user.id)
-        .first()
+    # Conditional UPDATE first, so concurrent requests decrement the unread count once
+    await _mark_read(db, current_user.id, Notification.id == notif_id)
+    notif = await db.scalar(
+        select(Notification)
+        .where(Notification.id == notif_id, Notification.user_id == current_user.id)
     )
     if not notif:
         raise HTTPException(status_code=404, detail="Notification not found")
 
-    notif.is_read = True
-    db.commit()
-    db.refresh(notif)
+    return notif
 
-    cache_key = f"user:{current_user.id}:notifications"
-    redis_client.delete(cache_key)
 
-    return notif
+@router.put("/read-all", response_model=NotificationsReadOut)
+async def mark_all_as_read(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await _mark_read(db, current_user.id)
+
 
+@router.put("/read", response_model=NotificationsReadOut)
+async def mark_many_as_read(
+    payload: NotificationIdsIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await _mark_read(db, current_user.id, Notification.id.in_(set(payload.ids)))
+
+
+@router.put("/task/{task_id}/read", response_model=NotificationsReadOut)
+async def mark_task_as_read(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    return await _mark_read(db, current_user.id, Notification.task_id == task_id)
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
 from uuid import UUID
 
 from app.models import Organization, User
-from app.schemas import OrganizationOut, UserOut, UserCreateByAdmin, OrganizationUpdate
-from database import get_db
-from app.dependencies import get_current_user
-from app.core.security import hash_password
+from app.schemas import OrganizationOut, UserOut, UserCreateByAdmin, OrganizationUpdate, Page
+from app.core.pagination import PageParams, keyset, page_params, split_page
+from database import get_async_db, get_db
+from app.dependencies import get_current_user, get_read_db
+from app.services import membership
+from app.core.hashing import password_hasher
 from fastapi.responses import Response
 
 router = APIRouter(
@@ -35,48 +38,49 @@ def update_organization(
     if payload.description:
         org.description = payload.description
     db.commit()
-    db.refresh(org)
 
     return org
 
 
 # Get all users in organization (except current_user)
-@router.get("/users", response_model=List[UserOut])
-def get_users_in_organization(
-    db: Session = Depends(get_db),
+@router.get("/users", response_model=Page[UserOut])
+async def get_users_in_organization(
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    users = (
-        db.query(User)
-        .filter(
+    users = await db.scalars(keyset(
+        select(User)
+        .where(
             User.organization_id == current_user.organization_id,
             User.id != current_user.id
-        )
-        .all()
-    )
-    return users
+        ),
+        page, User.created_at, User.id,
+    ))
+    users, next_cursor = split_page(users.all(), page)
+    return Page(items=users, next=next_cursor)
 
 
 # Add user to organization (Admin only)
 @router.post("/add-user", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def add_user_to_org(
+async def add_user_to_org(
     payload: UserCreateByAdmin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only Admin can add user")
 
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = await db.scalar(select(User.id).where(User.email == payload.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = User(
         email=payload.email,
-        hash_password=hash_password(payload.password),
+        hash_password=await password_hasher.hash(payload.password),
         full_name=payload.full_name,
         gender=payload.gender,
         role=payload.role,
@@ -84,30 +88,33 @@ def add_user_to_org(
         is_active=True,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return new_user
 
 
 # Delete user in organization (Admin only)
 @router.delete("/user/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_in_org(
+async def delete_user_in_org(
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only Admin can delete users")
 
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.organization_id == current_user.organization_id
-    ).first()
+    user = await db.scalar(
+        select(User)
+        .where(
+            User.id == user_id,
+            User.organization_id == current_user.organization_id
+        )
+    )
     if not user:
         raise HTTPException(status_code=404, detail="User not found in your organization")
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    membership.invalidate_user(user_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
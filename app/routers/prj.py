@@ -1,86 +1,94 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
 from uuid import UUID
 
 from app.models import Project, User, Task, TaskStatus
-from app.schemas import ProjectOut, ProjectCreate, TaskOut
-from database import get_db
-from app.dependencies import get_current_user, require_project_access
-from sqlalchemy import func
+from app.schemas import ProjectOut, ProjectCreate, ProjectMembersBulkIn, BulkItemResult, BulkResult, TaskOut, Page
+from app.core.pagination import PageParams, keyset, page_params, split_page
+from database import get_async_db
+from app.dependencies import get_current_user, get_read_db, require_project_access
 from datetime import timezone, datetime
 from sqlalchemy import exists
 from app.models import project_members
+from app.services import membership
+from app.services.task_counters import task_status_counts
 
 router = APIRouter(
     prefix="/projects",
     tags=["Projects"]
 )
 
+
+async def _get_org_project(db: AsyncSession, project_id: UUID, organization_id: UUID):
+    # members are serialized by ProjectOut and cannot be lazy-loaded on an AsyncSession
+    return await db.scalar(
+        select(Project)
+        .options(selectinload(Project.members))
+        .where(Project.id == project_id, Project.organization_id == organization_id)
+    )
+
 # Create project
 @router.post("/create", response_model=ProjectOut, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     payload: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to create project")
 
     # check duplicate name in org
-    existing = (
-        db.query(Project)
-        .filter(Project.organization_id == current_user.organization_id, Project.name == payload.name)
-        .first()
+    existing = await db.scalar(
+        select(Project.id)
+        .where(Project.organization_id == current_user.organization_id, Project.name == payload.name)
     )
     if existing:
         raise HTTPException(status_code=400, detail="Project name already exists in this organization")
 
+    # add creator as member in the same transaction
     new_project = Project(
         name=payload.name,
         description=payload.description,
-        organization_id=current_user.organization_id
+        organization_id=current_user.organization_id,
+        members=[current_user],
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
-
-    # add creator as member
-    user = db.merge(current_user)   
-    new_project.members.append(user)
-    db.commit()
+    await db.commit()
     return new_project
 
 
 # Get all projects of the current user
-@router.get("/")
-def get_projects(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Page[UUID])
+async def get_projects(
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    project_ids = db.query(Project.id).filter(
+    project_ids = select(Project.id, Project.created_at).where(
         Project.organization_id == current_user.organization_id
     )
 
     if current_user.role == "member":
-        project_ids = project_ids.join(Project.members).filter(User.id == current_user.id)
+        project_ids = project_ids.join(Project.members).where(User.id == current_user.id)
 
-    return [pid for (pid,) in project_ids.all()]
+    rows = await db.execute(keyset(project_ids, page, Project.created_at, Project.id))
+    rows, next_cursor = split_page(rows.all(), page)
+    return Page(items=[row.id for row in rows], next=next_cursor)
 
 
 
 # Get project detail
 @router.get("/{project_id}", response_model=ProjectOut)
-def get_project(
+async def get_project(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    project = (
-        db.query(Project)
-        .filter(Project.id == project_id, Project.organization_id == current_user.organization_id)
-        .first()
-    )
+    project = await _get_org_project(db, project_id, current_user.organization_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -93,30 +101,26 @@ def get_project(
 
 # Update project
 @router.put("/{project_id}", response_model=ProjectOut)
-def update_project(
+async def update_project(
     project_id: UUID,
     payload: ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to update project")
 
-    project = db.query(Project).filter(
-        Project.id == project_id,
-        Project.organization_id == current_user.organization_id
-    ).first()
+    project = await _get_org_project(db, project_id, current_user.organization_id)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # check duplicate name (excluding itself)
-    existing = (
-        db.query(Project)
-        .filter(Project.organization_id == current_user.organization_id,
-                Project.name == payload.name,
-                Project.id != project_id)
-        .first()
+    existing = await db.scalar(
+        select(Project.id)
+        .where(Project.organization_id == current_user.organization_id,
+               Project.name == payload.name,
+               Project.id != project_id)
     )
     if existing:
         raise HTTPException(status_code=400, detail="Project name already exists in this organization")
@@ -125,47 +129,47 @@ def update_project(
         project.name = payload.name
     if payload.description:
         project.description = payload.description
-    db.commit()
-    db.refresh(project)
+    await db.commit()
     return project
 
 
 # Delete project
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
+async def delete_project(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to delete project")
 
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.organization_id == current_user.organization_id
-    ).first()
+    ))
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
+    membership.invalidate_project(project_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 # Add member
 @router.post("/{project_id}/members")
-def add_member(
+async def add_member(
     project_id: UUID,
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to add member")
 
-    project = db.query(Project).filter_by(id=project_id, organization_id=current_user.organization_id).first()
-    user = db.query(User).filter_by(id=user_id, organization_id=current_user.organization_id).first()
+    project = await _get_org_project(db, project_id, current_user.organization_id)
+    user = await db.scalar(select(User).where(User.id == user_id, User.organization_id == current_user.organization_id))
 
     if not project or not user:
         raise HTTPException(status_code=404, detail="Project or user not found")
@@ -174,23 +178,24 @@ def add_member(
         raise HTTPException(status_code=400, detail="Already a member")
 
     project.members.append(user)
-    db.commit()
+    await db.commit()
+    membership.invalidate_membership(project_id, user_id)
     return {"message": "Member added successfully"}
 
 
 # Remove member
 @router.delete("/{project_id}/members/{user_id}")
-def remove_member(
+async def remove_member(
     project_id: UUID,
     user_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to remove member")
 
-    project = db.query(Project).filter_by(id=project_id, organization_id=current_user.organization_id).first()
-    user = db.query(User).filter_by(id=user_id, organization_id=current_user.organization_id).first()
+    project = await _get_org_project(db, project_id, current_user.organization_id)
+    user = await db.scalar(select(User).where(User.id == user_id, User.organization_id == current_user.organization_id))
 
     if not project or not user:
         raise HTTPException(status_code=404, detail="Project or user not found")
@@ -206,41 +211,117 @@ def remove_member(
         raise HTTPException(status_code=403, detail="Managers cannot remove admins/managers")
 
     project.members.remove(user)
-    db.commit()
+    await db.commit()
+    membership.invalidate_membership(project_id, user_id)
     return {"message": "Member removed successfully"}
 
-#Count of tasks by status in a project
-@router.get("/{project_id}/report/status")
-def task_status_report(
+async def _org_project_exists(db: AsyncSession, project_id: UUID, organization_id: UUID) -> bool:
+    return await db.scalar(
+        select(exists().where(Project.id == project_id, Project.organization_id == organization_id))
+    )
+
+
+async def _org_user_roles(db: AsyncSession, user_ids, organization_id: UUID):
+    rows = await db.execute(
+        select(User.id, User.role).where(User.id.in_(set(user_ids)), User.organization_id == organization_id)
+    )
+    return {user_id: role for user_id, role in rows}
+
+
+def _bulk_result(results: List[BulkItemResult]) -> BulkResult:
+    succeeded = sum(1 for result in results if result.error is None)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, items=results)
+
+
+# Add many members; users who are already members count as added
+@router.post("/{project_id}/members/bulk", response_model=BulkResult)
+async def add_members(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    payload: ProjectMembersBulkIn,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized to add member")
+    if not await _org_project_exists(db, project_id, current_user.organization_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    roles = await _org_user_roles(db, payload.user_ids, current_user.organization_id)
+    results = [
+        BulkItemResult(index=index, id=user_id, error=None if user_id in roles else "User not found")
+        for index, user_id in enumerate(payload.user_ids)
+    ]
+    if roles:
+        await db.execute(
+            insert(project_members)
+            .values([{"project_id": project_id, "user_id": user_id} for user_id in roles])
+            .on_conflict_do_nothing()
+        )
+        await db.commit()
+        for user_id in roles:
+            membership.invalidate_membership(project_id, user_id)
+    return _bulk_result(results)
+
+
+# Remove many members; users who are not members count as removed
+@router.post("/{project_id}/members/bulk-remove", response_model=BulkResult)
+async def remove_members(
+    project_id: UUID,
+    payload: ProjectMembersBulkIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized to remove member")
+    if not await _org_project_exists(db, project_id, current_user.organization_id):
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    require_project_access(project_id, db, current_user)    
+    roles = await _org_user_roles(db, payload.user_ids, current_user.organization_id)
+    results, removable = [], set()
+    for index, user_id in enumerate(payload.user_ids):
+        error = None
+        if user_id not in roles:
+            error = "User not found"
+        elif user_id == current_user.id:
+            error = "You cannot remove yourself from the project"
+        elif current_user.role == "manager" and roles[user_id] in ["admin", "manager"]:
+            error = "Managers cannot remove admins/managers"
+        else:
+            removable.add(user_id)
+        results.append(BulkItemResult(index=index, id=user_id, error=error))
+
+    if removable:
+        await db.execute(
+            delete(project_members)
+            .where(project_members.c.project_id == project_id, project_members.c.user_id.in_(removable))
+        )
+        await db.commit()
+        for user_id in removable:
+            membership.invalidate_membership(project_id, user_id)
+    return _bulk_result(results)
 
-    result = (
-        db.query(Task.status, func.count(Task.id))
-        .filter(Task.project_id == project_id)
-        .group_by(Task.status)
-        .all()
-    )
-    return {status: count for status, count in result}
+#Count of tasks by status in a project
+@router.get("/{project_id}/report/status")
+async def task_status_report(
+    project_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_project_access)
+):
+    return await task_status_counts(db, project_id)
 
 #List of overdue tasks in a project
 @router.get("/{project_id}/report/overdue", response_model=List[TaskOut])
-def overdue_tasks(
+async def overdue_tasks(
     project_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)):
-
-    require_project_access(project_id, db, current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_project_access)):
 
     now = datetime.now(timezone.utc)
-    tasks = (
-        db.query(Task)
-        .filter(Task.project_id == project_id, Task.due_date < now, Task.status != 'done')
-        .all()
+    tasks = await db.scalars(
+        select(Task)
+        # 'done' inlined, not a bound parameter, so generic plans of the prepared
+        # statement can still use the partial index on open tasks
+        .where(Task.project_id == project_id, Task.due_date < now, Task.status != literal_column("'done'"))
     )
-    return tasks
+    return tasks.all()
 
@@ -1,13 +1,17 @@
+from collections import Counter
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from uuid import UUID
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
 
-from app.models import Task, User, Project
-from app.schemas import TaskOut, TaskCreate, TaskUpdate
-from database import get_db
-from app.dependencies import require_project_access, get_current_user
-from app.services.notification import create_notification
+from app.models import Task, TaskStatus, User, project_members
+from app.schemas import TaskOut, TaskCreate, TaskUpdate, TaskBulkCreate, TaskBulkUpdate, BulkItemResult, BulkResult, Page
+from app.core.pagination import PageParams, keyset, page_params, split_page
+from database import get_async_db
+from app.dependencies import require_project_access, get_current_user, get_task_for_user
+from app.services.notification import create_notification, create_notifications
+from app.services.membership import check_project_membership, project_memberships
+from app.services.task_counters import adjust_task_count, move_task_count
 
 router = APIRouter(
     prefix="/tasks",
@@ -15,21 +19,25 @@ router = APIRouter(
 
 )
 
+VALID_TRANSITIONS = {
+    "todo": ["in_progress"],
+    "in_progress": ["done"],
+    "done": []
+}
+
 # Create a new task
 @router.post("/create", response_model=TaskOut)
-def create_task(
+async def create_task(
     project_id: UUID,
     payload: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_project_access),
 ):
     if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Not authorized to create task in this project")
     
     if payload.assignee_id:
-        project = db.query(Project).filter(Project.id == project_id).first()
-        member_ids = [m.id for m in project.members]
-        if payload.assignee_id not in member_ids:
+        if not await check_project_membership(db, project_id, payload.assignee_id):
             raise HTTPException(status_code=400, detail="Assignee must be a member of this project")
 
     task = Task(
@@ -42,87 +50,196 @@ def create_task(
         created_by=current_user.id,
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.flush()
+    await adjust_task_count(db, project_id, task.status, 1)
 
     # Notification: if assigned
     if payload.assignee_id and payload.assignee_id != current_user.id:
         create_notification(db, task.id, payload.assignee_id, f"You have been assigned task '{task.title}'")
 
+    await db.commit()
     return task
 
 
+# Create many tasks in a project
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_tasks(
+    project_id: UUID,
+    payload: TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_project_access),
+):
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(status_code=403, detail="Not authorized to create task in this project")
+
+    members = await project_memberships(db, {(project_id, item.assignee_id) for item in payload.items})
+
+    results, rows, notifications = [], [], []
+    for index, item in enumerate(payload.items):
+        if (project_id, item.assignee_id) not in members:
+            results.append(BulkItemResult(index=index, error="Assignee must be a member of this project"))
+            continue
+        task_id = uuid4()
+        rows.append({
+            "id": task_id,
+            "title": item.title,
+            "description": item.description,
+            "priority": item.priority,
+            "due_date": item.due_date,
+            "status": TaskStatus.TODO.value,
+            "project_id": project_id,
+            "assignee_id": item.assignee_id,
+            "created_by": current_user.id,
+        })
+        results.append(BulkItemResult(index=index, id=task_id))
+        if item.assignee_id != current_user.id:
+            notifications.append((task_id, item.assignee_id, f"You have been assigned task '{item.title}'"))
+
+    if rows:
+        await db.execute(insert(Task).values(rows))
+        await adjust_task_count(db, project_id, TaskStatus.TODO, len(rows))
+        create_notifications(db, notifications)
+        await db.commit()
+    return BulkResult(succeeded=len(rows), failed=len(results) - len(rows), items=results)
+
+
+# Update many tasks; each item is validated like PUT /tasks/{task_id}
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_tasks(
+    payload: TaskBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(status_code=403, detail="Not authorized to update this task")
+
+    is_member = (
+        exists()
+        .where(
+            project_members.c.project_id == Task.project_id,
+            project_members.c.user_id == current_user.id,
+        )
+        .label("is_member")
+    )
+    rows = await db.execute(
+        select(Task.id, Task.project_id, Task.status, Task.assignee_id, Task.due_date, Task.title, is_member)
+        .where(Task.id.in_({item.id for item in payload.items}))
+    )
+    # current state per task, advanced as items apply so repeated ids chain
+    tasks = {row.id: row._asdict() for row in rows}
+    members = await project_memberships(db, {
+        (tasks[item.id]["project_id"], item.assignee_id)
+        for item in payload.items if item.assignee_id and item.id in tasks
+    })
+
+    results, changes, notifications = [], {}, []
+    counts = Counter()
+    for index, item in enumerate(payload.items):
+        task = tasks.get(item.id)
+        if task is None:
+            results.append(BulkItemResult(index=index, id=item.id, error="Task not found"))
+            continue
+        if not task["is_member"]:
+            results.append(BulkItemResult(index=index, id=item.id, error="Not authorized for this project"))
+            continue
+        if item.status and item.status not in VALID_TRANSITIONS.get(task["status"], []):
+            results.append(BulkItemResult(index=index, id=item.id, error="Invalid status transition"))
+            continue
+        if item.assignee_id and (task["project_id"], item.assignee_id) not in members:
+            results.append(BulkItemResult(index=index, id=item.id, error="Assignee must be a member of this project"))
+            continue
+
+        # null means "leave unchanged": none of these columns may be cleared
+        values = item.model_dump(exclude_none=True, exclude={"id"})
+        if not values:
+            results.append(BulkItemResult(index=index, id=item.id))
+            continue
+        if "due_date" in values and values["due_date"] != task["due_date"]:
+            # A new deadline gets its own due-soon / overdue reminders
+            values.update(due_soon_notified_at=None, overdue_notified_at=None)
+        assignee_id = item.assignee_id or task["assignee_id"]
+        if item.status:
+            counts[task["project_id"], task["status"]] -= 1
+            counts[task["project_id"], item.status] += 1
+            if assignee_id:
+                notifications.append((item.id, assignee_id, f"Task '{task['title']}' moved to {item.status}"))
+        if item.assignee_id and item.assignee_id != task["assignee_id"]:
+            notifications.append((item.id, item.assignee_id, f"You have been assigned task '{task['title']}'"))
+            if task["assignee_id"]:
+                notifications.append((item.id, task["assignee_id"], f"Your task '{task['title']}' has been reassigned"))
+        task.update((key, value) for key, value in values.items() if key in task)
+        changes.setdefault(item.id, {"id": item.id}).update(values)
+        results.append(BulkItemResult(index=index, id=item.id))
+
+    if changes:
+        # ORM bulk UPDATE by primary key: one executemany per distinct set of columns
+        await db.execute(update(Task), list(changes.values()))
+        for (project_id, status), delta in counts.items():
+            if delta:
+                await adjust_task_count(db, project_id, status, delta)
+        create_notifications(db, notifications)
+        await db.commit()
+    succeeded = sum(1 for result in results if result.error is None)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, items=results)
+
+
 # List tasks in a project
-@router.get("/project/{project_id}", response_model=List[UUID])
-def list_tasks(
+@router.get("/project/{project_id}", response_model=Page[UUID])
+async def list_tasks(
     project_id: UUID,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    require_project_access(project_id, db, current_user)
-    task_ids = db.query(Task.id).filter(Task.project_id == project_id).all()
-    return [tid for (tid,) in task_ids]
+    await require_project_access(project_id, db, current_user)
+    rows = await db.execute(keyset(
+        select(Task.id, Task.created_at).where(Task.project_id == project_id),
+        page, Task.created_at, Task.id,
+    ))
+    rows, next_cursor = split_page(rows.all(), page)
+    return Page(items=[row.id for row in rows], next=next_cursor)
 
 
 # Get task details
 @router.get("/{task_id}", response_model=TaskOut)
-def get_task(
-    task_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-    
+async def get_task(
+    task: Task = Depends(get_task_for_user),
 ):
-    
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)
-    
     return task
 
 
 # Update task
 @router.put("/{task_id}", response_model=TaskOut)
-def update_task(
-    task_id: UUID,
+async def update_task(
     payload: TaskUpdate,
-    db: Session = Depends(get_db),
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user), 
 ):
-    
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)
-    
     if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Not authorized to update this task")
 
     if payload.status:
-        valid_transitions = {
-            "todo": ["in_progress"],
-            "in_progress": ["done"],
-            "done": []
-        }
-        if task.status not in valid_transitions:
+        if task.status not in VALID_TRANSITIONS:
             raise HTTPException(status_code=400, detail="Invalid current status")        
-        if payload.status not in valid_transitions[task.status]:
+        if payload.status not in VALID_TRANSITIONS[task.status]:
             raise HTTPException(status_code=400, detail="Invalid status transition")
     
     if payload.assignee_id:
-        project = db.query(Project).filter(Project.id == task.project_id).first()
-        member_ids = [m.id for m in project.members]
-        if payload.assignee_id not in member_ids:
+        if not await check_project_membership(db, task.project_id, payload.assignee_id):
             raise HTTPException(status_code=400, detail="Assignee must be a member of this project")
 
     old_assignee = task.assignee_id
+    old_status = task.status
+    old_due_date = task.due_date
 
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(task, field, value)
-
-
-    db.commit()
-    db.refresh(task)
+    await move_task_count(db, task.project_id, old_status, task.status)
+    if task.due_date != old_due_date:
+        # A new deadline gets its own due-soon / overdue reminders
+        task.due_soon_notified_at = None
+        task.overdue_notified_at = None
 
     # Notifications
     if payload.status:
@@ -133,27 +250,23 @@ def update_task(
         if old_assignee:
             create_notification(db, task.id, old_assignee, f"Your task '{task.title}' has been reassigned")  
 
+    await db.commit()
     return task
 
 
 # Delete task
 @router.delete("/{task_id}", status_code=204)
-def delete_task(
-    task_id: UUID,
-    db: Session = Depends(get_db),
+async def delete_task(
+    task: Task = Depends(get_task_for_user),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user), 
 ):
-    
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    require_project_access(task.project_id, db, current_user)
-
     if current_user.role not in ['admin', 'manager']:
         raise HTTPException(status_code=403, detail="Not authorized to delete this task")
-    if task.assignee_id and task.assignee_id != current_user.id:
-        create_notification(db, task_id, task.assignee_id, f"Task '{task.title}' has been deleted")
+    # No "task deleted" notification: notifications reference their task, so one
+    # for a deleted task cannot be stored (the outbox worker drops such events)
 
-    db.delete(task)
-    db.commit()
+    await adjust_task_count(db, task.project_id, task.status, -1)
+    await db.delete(task)
+    await db.commit()
     return None
@@ -1,4 +1,4 @@
-from .schemas import OrganizationOut, ProjectOut, ProjectCreate, TokenOut, RegisterIn, LoginIn, RefreshIn, ProjectMemberIn, ProjectMemberOut, UserOut, UserCreateByAdmin, TaskBase, TaskCreate, TaskOut, TaskUpdate, NotificationOut, OrganizationUpdate, ProjectUpdate, UserUpdate, TaskCommentOut, TaskCommentCreate, TaskAttachmentOut 
+from .schemas import OrganizationOut, ProjectOut, ProjectCreate, TokenOut, RegisterIn, LoginIn, RefreshIn, ProjectMemberIn, ProjectMembersBulkIn, ProjectMemberOut, UserOut, UserCreateByAdmin, TaskBase, TaskCreate, TaskOut, TaskUpdate, TaskBulkCreate, TaskBulkUpdateItem, TaskBulkUpdate, BulkItemResult, BulkResult, NotificationOut, NotificationIdsIn, NotificationsReadOut, UnreadCountOut, OrganizationUpdate, ProjectUpdate, UserUpdate, TaskCommentOut, TaskCommentCreate, TaskAttachmentOut, Page
 
 __all__ = [
     "TokenOut",
@@ -9,6 +9,7 @@ __all__ = [
     "ProjectOut",
     "ProjectCreate", 
     "ProjectMemberIn",
+    "ProjectMembersBulkIn",
     "ProjectMemberOut",
     "UserOut",
     "UserCreateByAdmin",
@@ -16,11 +17,20 @@ __all__ = [
     "TaskCreate",
     "TaskOut",
     "TaskUpdate",
+    "TaskBulkCreate",
+    "TaskBulkUpdateItem",
+    "TaskBulkUpdate",
+    "BulkItemResult",
+    "BulkResult",
     "NotificationOut",
+    "NotificationIdsIn",
+    "NotificationsReadOut",
+    "UnreadCountOut",
     "OrganizationUpdate",
     "ProjectUpdate",
     "UserUpdate",
     "TaskCommentOut",
     "TaskCommentCreate",
-    "TaskAttachmentOut"
+    "TaskAttachmentOut",
+    "Page",
 ]
@@ -1,9 +1,21 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
-from typing import List, Optional, Literal
+from typing import Generic, List, Optional, Literal, TypeVar
 from pydantic import EmailStr, constr
 from datetime import datetime
 
+from config import settings
+
+
+
+T = TypeVar("T")
+
+
+#Pagination
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    # opaque cursor for the following page; None on the last page
+    next: Optional[str] = None
 
 
 #Authentication
@@ -89,6 +101,9 @@ class ProjectUpdate(BaseModel):
 class ProjectMemberIn(BaseModel):
     user_id: UUID
 
+class ProjectMembersBulkIn(BaseModel):
+    user_ids: List[UUID] = Field(min_length=1, max_length=settings.bulk_max_items)
+
 class ProjectMemberOut(BaseModel):
     user_id:  UUID
     project_id:  UUID
@@ -120,6 +135,30 @@ class TaskOut(TaskBase):
     class Config:
         orm_mode = True
 
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+class TaskBulkUpdateItem(BaseModel):
+    id: UUID
+    status: Optional[Literal["todo", "in_progress", "done"]] = None
+    priority: Optional[Literal["low", "medium", "high"]] = None
+    due_date: Optional[datetime] = None
+    assignee_id: Optional[UUID] = None
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+class BulkItemResult(BaseModel):
+    # position of the item in the request
+    index: int
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BulkItemResult]
+
 
 #notification
 class NotificationOut(BaseModel):
@@ -134,6 +173,17 @@ class NotificationOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+class UnreadCountOut(BaseModel):
+    unread: int
+
+class NotificationIdsIn(BaseModel):
+    ids: List[UUID] = Field(min_length=1, max_length=settings.bulk_max_items)
+
+class NotificationsReadOut(BaseModel):
+    # notifications that were unread and are now read
+    updated: int
+    ids: List[UUID]
     
 
 
@@ -0,0 +1,96 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import func, insert, select, update
+
+from app.models import Notification, NotificationType, Task, TaskStatus
+from app.services.notification_cache import invalidate_notifications
+from app.services.notification_stream import publish_notifications
+from app.services.unread_counter import record_unread
+from config import settings
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+KINDS = {
+    # kind: (flag column, notification type, title, message)
+    "due_soon": (Task.due_soon_notified_at, NotificationType.TASK_DUE_SOON, "Task Due Soon", "Task '{title}' is due soon"),
+    "overdue": (Task.overdue_notified_at, NotificationType.TASK_OVERDUE, "Task Overdue", "Task '{title}' is overdue"),
+}
+
+
+def _notify_batch(db, kind: str, lower: datetime, upper: datetime, batch_size: int) -> List[Notification]:
+    flag, notification_type, title, message = KINDS[kind]
+    # Range scan on the partial index of open, not-yet-notified tasks. SKIP LOCKED
+    # lets several workers share the scan and never waits on request transactions.
+    pending_ids = (
+        select(Task.id)
+        .where(
+            Task.status != TaskStatus.DONE.value,
+            flag.is_(None),
+            # nullable in the database; nobody to notify
+            Task.assignee_id.is_not(None),
+            Task.due_date >= lower,
+            Task.due_date < upper,
+        )
+        .order_by(Task.due_date)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    # Claiming the rows and inserting their notifications in one transaction is
+    # what keeps a task from being notified twice
+    claimed = db.execute(
+        update(Task)
+        .where(Task.id.in_(pending_ids))
+        # keep updated_at: a reminder is not an edit of the task
+        .values({flag: func.now(), Task.updated_at: Task.updated_at})
+        .returning(Task.id, Task.assignee_id, Task.title),
+        execution_options={"synchronize_session": False},
+    ).all()
+    if not claimed:
+        return []
+    # RETURNING the rows so they can be pushed to open notification streams after commit
+    notifications = db.scalars(insert(Notification).returning(Notification), [
+        {
+            "user_id": assignee_id,
+            "task_id": task_id,
+            "type": notification_type.value,
+            "title": title,
+            "message": message.format(title=task_title),
+            "is_read": False,
+        }
+        for task_id, assignee_id, task_title in claimed
+    ]).all()
+    for notification in notifications:
+        record_unread(db, notification.user_id, 1)
+    invalidate_notifications(db, {notification.user_id for notification in notifications})
+    return notifications
+
+
+def notify_due_tasks(batch_size: int = settings.due_date_scan_batch_size) -> Dict[str, int]:
+    """Emit due-soon and overdue notifications for tasks crossing their thresholds."""
+    now = datetime.now(timezone.utc)
+    windows = {
+        "due_soon": (now, now + timedelta(hours=settings.task_due_soon_hours)),
+        "overdue": (now - timedelta(hours=settings.task_overdue_lookback_hours), now),
+    }
+    sent = {}
+    started = time.monotonic()
+    for kind, (lower, upper) in windows.items():
+        sent[kind] = 0
+        while True:
+            with SessionLocal() as db:
+                notifications = _notify_batch(db, kind, lower, upper, batch_size)
+                db.commit()
+            publish_notifications(notifications)
+            sent[kind] += len(notifications)
+            if len(notifications) < batch_size:
+                break
+    logger.info(
+        "due date scan sent %d due-soon and %d overdue notifications in %.2fs",
+        sent["due_soon"], sent["overdue"], time.monotonic() - started,
+    )
+    return sent
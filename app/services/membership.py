@@ -0,0 +1,76 @@
+"""Project membership checks backed by a single EXISTS probe on project_members.
+
+Results can be cached per (user, project) in process when
+`membership_cache_ttl_seconds` is set. Writers must call the invalidate_*
+helpers after committing membership, project or user changes; other workers
+converge within the TTL.
+"""
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import exists, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.models import Project, project_members
+from config import settings
+
+_cache = TTLCache(settings.membership_cache_max_entries, settings.membership_cache_ttl_seconds)
+
+
+def _key(user_id, project_id):
+    return (str(user_id), str(project_id))
+
+
+async def check_project_membership(db: AsyncSession, project_id, user_id) -> Optional[bool]:
+    """Return None if the project does not exist, else whether the user is a member."""
+    key = _key(user_id, project_id)
+    if settings.membership_cache_ttl_seconds > 0:
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+    project_exists, is_member = (await db.execute(
+        select(
+            exists().where(Project.id == project_id),
+            exists().where(
+                project_members.c.project_id == project_id,
+                project_members.c.user_id == user_id,
+            ),
+        )
+    )).one()
+    if not project_exists:
+        return None
+
+    if settings.membership_cache_ttl_seconds > 0:
+        _cache.set(key, is_member)
+    return is_member
+
+
+async def project_memberships(db: AsyncSession, pairs: Iterable[Tuple[Any, Any]]) -> Set[Tuple[Any, Any]]:
+    """Return which (project_id, user_id) pairs are memberships, in a single query."""
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    rows = await db.execute(
+        select(project_members.c.project_id, project_members.c.user_id)
+        .where(tuple_(project_members.c.project_id, project_members.c.user_id).in_(pairs))
+    )
+    return {(project_id, user_id) for project_id, user_id in rows}
+
+
+def invalidate_membership(project_id, user_id) -> None:
+    _cache.delete(_key(user_id, project_id))
+
+
+def invalidate_project(project_id) -> None:
+    project_id = str(project_id)
+    _cache.delete_where(lambda key: key[1] == project_id)
+
+
+def invalidate_user(user_id) -> None:
+    user_id = str(user_id)
+    _cache.delete_where(lambda key: key[0] == user_id)
+
+
+def membership_cache_stats() -> Dict[str, Any]:
+    return dict(_cache.stats(), enabled=settings.membership_cache_ttl_seconds > 0)
@@ -1,20 +1,48 @@
+"""Notification creation for request handlers.
+
+Notifications are not written inline. `create_notification(s)` stage rows on
+the session, and just before it commits they are appended to
+notification_outbox with a single multi-row INSERT, so a request costs one
+statement however many recipients a change has. A rollback discards them.
+The outbox worker (app.services.notification_outbox) writes the
+notifications themselves.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Iterable, Tuple
 from uuid import UUID
-from app.models import Notification
-from datetime import  timedelta
-
-def create_notification(db: Session, task_id: UUID, user_id: UUID, message: str):
-    """Create and save a notification for a user."""
-    notif = Notification(
-        user_id=user_id,
-        message=message,
-        is_read=False,
-        task_id=task_id,
-        type='task_assigned',
-        title="Task Assigned" 
-
-    )
-    db.add(notif)
-    db.commit()
-    db.refresh(notif)
-    return notif
+from app.models import NotificationType, notification_outbox
+
+
+def create_notification(db: AsyncSession, task_id: UUID, user_id: UUID, message: str):
+    """Queue a notification for a user; it is enqueued by the caller's commit."""
+    create_notifications(db, [(task_id, user_id, message)])
+
+
+def create_notifications(db: AsyncSession, notifications: Iterable[Tuple[UUID, UUID, str]]):
+    """Queue (task_id, user_id, message) notifications; enqueued by the caller's commit."""
+    pending = db.info.setdefault("notification_outbox", [])
+    for task_id, user_id, message in notifications:
+        pending.append({
+            "user_id": user_id,
+            "task_id": task_id,
+            "type": NotificationType.TASK_ASSIGNED.value,
+            "title": "Task Assigned",
+            "message": message,
+            # event time, so per-user order survives batching in the worker
+            "created_at": datetime.now(timezone.utc),
+        })
+
+
+@event.listens_for(Session, "before_commit")
+def _enqueue_pending(session):
+    rows = session.info.pop("notification_outbox", None)
+    if rows:
+        session.execute(insert(notification_outbox).values(rows))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("notification_outbox", None)
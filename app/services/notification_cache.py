@@ -0,0 +1,147 @@
+"""Per-user cache of notification list pages in Redis.
+
+Each user has a version counter and one hash of cached pages whose fields are
+"<version>:<cursor>:<limit>". Anything that changes a user's notifications
+(creation by the outbox worker or the due-date scan, read-state changes,
+deletions) calls `invalidate_notifications` in its transaction. After commit
+the version is bumped and the hash dropped in one round trip. A page is
+stored only if the version it was read under is still current, so a reader
+racing a commit cannot cache stale data. The hash holds at most
+`notification_cache_max_pages` pages and expires
+`notification_cache_ttl_seconds` after its first page was stored, so no page
+outlives the TTL.
+
+An invalidation that cannot reach Redis is lost. Versions are prefixed with a
+global epoch, and the process that lost the invalidation bumps the epoch on
+its next successful Redis access, which drops every cached page. Other
+processes cannot know about the loss, so until then they may serve pages
+cached before it; the TTL bounds that window.
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_async_redis, log_redis_error, run_pipeline
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_stats = {"hits": 0, "misses": 0, "stale_writes": 0, "errors": 0}
+
+_EPOCH_KEY = "notifications:cache_epoch"
+# Set when this process lost an invalidation; cleared once the epoch has been bumped
+_epoch_stale = False
+
+# KEYS: epoch, user version, user pages
+_VERSION = "local version = (redis.call('GET', KEYS[1]) or '0') .. '.' .. (redis.call('GET', KEYS[2]) or '0')"
+
+_GET_PAGE = _VERSION + """
+return {version, redis.call('HGET', KEYS[3], version .. ':' .. ARGV[1])}
+"""
+
+# ARGV: version read, page field, page JSON, max pages, ttl
+_SET_PAGE = _VERSION + """
+if version ~= ARGV[1] then
+    return -1
+end
+if redis.call('HLEN', KEYS[3]) >= tonumber(ARGV[4]) then
+    return 0
+end
+redis.call('HSET', KEYS[3], ARGV[1] .. ':' .. ARGV[2], ARGV[3])
+-- expire from the first page, not the latest, so the TTL bounds every page's age
+if redis.call('TTL', KEYS[3]) < 0 then
+    redis.call('EXPIRE', KEYS[3], ARGV[5])
+end
+return 1
+"""
+
+
+def _keys(user_id):
+    return f"user:{user_id}:notifications:version", f"user:{user_id}:notifications:pages"
+
+
+def _script_keys(user_id):
+    return (_EPOCH_KEY, *_keys(user_id))
+
+
+def _field(cursor: Optional[str], limit: int) -> str:
+    return f"{cursor or ''}:{limit}"
+
+
+async def get_cached_page(user_id, cursor: Optional[str], limit: int):
+    """Return (version, page JSON or None); version is None when Redis is unavailable."""
+    global _epoch_stale
+    redis = get_async_redis()
+    try:
+        if _epoch_stale:
+            await redis.incr(_EPOCH_KEY)
+            _epoch_stale = False
+        version, page = await redis.eval(_GET_PAGE, 3, *_script_keys(user_id), _field(cursor, limit))
+    except Exception:
+        _stats["errors"] += 1
+        log_redis_error(logger, "notification cache: redis get failed")
+        return None, None
+    _stats["hits" if page is not None else "misses"] += 1
+    return version, page
+
+
+async def cache_page(user_id, version: Optional[str], cursor: Optional[str], limit: int, page_json: str) -> None:
+    if version is None:
+        return
+    try:
+        stored = await get_async_redis().eval(
+            _SET_PAGE, 3, *_script_keys(user_id),
+            version, _field(cursor, limit), page_json,
+            settings.notification_cache_max_pages, settings.notification_cache_ttl_seconds,
+        )
+    except Exception:
+        _stats["errors"] += 1
+        log_redis_error(logger, "notification cache: redis set failed")
+        return
+    if stored == -1:
+        _stats["stale_writes"] += 1
+
+
+def invalidate_notifications(db, user_ids: Iterable) -> None:
+    """Drop the users' cached pages once the session commits."""
+    db.info.setdefault("notification_cache_invalidations", set()).update(str(user_id) for user_id in user_ids)
+
+
+def notification_cache_stats() -> Dict[str, Any]:
+    return dict(_stats, epoch_stale=_epoch_stale)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    user_ids = session.info.pop("notification_cache_invalidations", None)
+    if not user_ids:
+        return
+    bump_epoch = _epoch_stale
+
+    def build(pipe):
+        if bump_epoch:
+            pipe.incr(_EPOCH_KEY)
+        for user_id in user_ids:
+            version_key, pages_key = _keys(user_id)
+            pipe.incr(version_key)
+            pipe.delete(pages_key)
+
+    def on_error():
+        global _epoch_stale
+        _epoch_stale = True
+        _stats["errors"] += 1
+        log_redis_error(logger, "notification cache: redis invalidation failed")
+
+    def on_success():
+        global _epoch_stale
+        if bump_epoch:
+            _epoch_stale = False
+
+    run_pipeline(build, on_error, on_success)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("notification_cache_invalidations", None)
@@ -0,0 +1,113 @@
+"""Worker that moves queued notifications from notification_outbox to notifications.
+
+Each batch claims the oldest outbox rows (FOR UPDATE SKIP LOCKED, so several
+workers can drain in parallel), deletes them and inserts their notifications
+with one multi-row INSERT in the same transaction: a row is written exactly
+once or stays queued. Notifications keep the event time as created_at, which
+preserves each user's ordering however batches interleave. Committed batches
+are pushed to open notification streams.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, select
+
+from app.models import Notification, Task, User, notification_outbox
+from app.services.notification_cache import invalidate_notifications
+from app.services.notification_stream import publish_notifications
+from app.services.unread_counter import record_unread
+from config import settings
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_stats = {"drained": 0, "dropped": 0, "errors": 0, "last_drain_at": None, "last_lag_seconds": None}
+
+
+def _drain_batch(db, batch_size: int) -> Tuple[int, List[Notification]]:
+    claimed = (
+        select(notification_outbox.c.id)
+        .order_by(notification_outbox.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        delete(notification_outbox)
+        .where(notification_outbox.c.id.in_(claimed))
+        .returning(
+            notification_outbox.c.user_id, notification_outbox.c.task_id, notification_outbox.c.type,
+            notification_outbox.c.title, notification_outbox.c.message, notification_outbox.c.created_at,
+        )
+    ).all()
+    if not rows:
+        return 0, []
+
+    # The outbox has no foreign keys: skip events whose task or user was deleted meanwhile
+    tasks = set(db.scalars(select(Task.id).where(Task.id.in_({row.task_id for row in rows}))))
+    users = set(db.scalars(select(User.id).where(User.id.in_({row.user_id for row in rows}))))
+    live = [row for row in rows if row.task_id in tasks and row.user_id in users]
+    notifications = []
+    if live:
+        # ORM bulk INSERT ... RETURNING, sent as multi-row statements; the objects feed the live stream
+        notifications = db.scalars(insert(Notification).returning(Notification), [
+            {
+                "user_id": row.user_id,
+                "task_id": row.task_id,
+                "type": getattr(row.type, "value", row.type),
+                "title": row.title,
+                "message": row.message,
+                "is_read": False,
+                "created_at": row.created_at,
+            }
+            for row in live
+        ]).all()
+        for notification in notifications:
+            record_unread(db, notification.user_id, 1)
+        invalidate_notifications(db, {notification.user_id for notification in notifications})
+
+    _stats["dropped"] += len(rows) - len(live)
+    _stats["last_lag_seconds"] = (datetime.now(timezone.utc) - min(row.created_at for row in rows)).total_seconds()
+    return len(rows), notifications
+
+
+def drain_notification_outbox(batch_size: int = settings.notification_outbox_batch_size) -> int:
+    """Write queued notifications in batches until the outbox is empty; return rows drained."""
+    total = 0
+    started = time.monotonic()
+    try:
+        while True:
+            with SessionLocal() as db:
+                drained, notifications = _drain_batch(db, batch_size)
+                db.commit()
+            publish_notifications(notifications)
+            total += drained
+            _stats["drained"] += drained
+            if drained < batch_size:
+                break
+    except Exception:
+        _stats["errors"] += 1
+        raise
+    finally:
+        _stats["last_drain_at"] = datetime.now(timezone.utc).isoformat()
+    if total:
+        logger.info("notification outbox drained %d rows in %.2fs", total, time.monotonic() - started)
+    return total
+
+
+def notification_outbox_stats() -> Dict[str, Any]:
+    """Worker counters plus the current queue depth and the age of its oldest event."""
+    stats = dict(_stats)
+    try:
+        with SessionLocal() as db:
+            depth, oldest = db.execute(
+                select(func.count(), func.min(notification_outbox.c.created_at))
+            ).one()
+        stats["depth"] = depth
+        stats["oldest_age_seconds"] = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0
+    except Exception:
+        logger.warning("notification outbox: depth query failed", exc_info=True)
+        stats["depth"] = stats["oldest_age_seconds"] = None
+    return stats
@@ -0,0 +1,153 @@
+"""Retention job for notifications.
+
+Read notifications older than `notification_retention_read_days` and unread
+ones older than `notification_retention_unread_days` leave `notifications` in
+short batches: oldest first, FOR UPDATE SKIP LOCKED, with a pause between
+batches. With `notification_retention_mode = "archive"`, a single statement
+(DELETE ... RETURNING feeding an INSERT) moves each batch to
+notification_archive. With "delete", the rows are dropped. After each commit
+the affected users' unread counters are adjusted and their cached pages are
+invalidated.
+
+notification_archive is partitioned by month of archiving. Before archiving,
+the job creates the partitions for the current and the next month. It drops
+whole partitions older than `notification_archive_retention_months`, which is
+much cheaper than deleting their rows.
+"""
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+
+from app.models import Notification, notification_archive
+from app.services.notification_cache import invalidate_notifications
+from app.services.unread_counter import record_unread
+from config import settings
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_PREFIX = "notification_archive_p"
+_ARCHIVED_COLUMNS = ("id", "user_id", "task_id", "type", "title", "message", "is_read", "created_at")
+
+_stats = {"archived": 0, "deleted": 0, "partitions_dropped": 0, "errors": 0, "last_run_at": None}
+
+
+def _month_start(moment: datetime, months_ahead: int = 0) -> datetime:
+    month = moment.year * 12 + moment.month - 1 + months_ahead
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _partition_name(month_start: datetime) -> str:
+    return f"{_PARTITION_PREFIX}{month_start:%Y%m}"
+
+
+def ensure_archive_partitions(db, now: datetime) -> None:
+    """Create the archive partitions for the month of `now` and the next one."""
+    for months_ahead in (0, 1):
+        start, end = _month_start(now, months_ahead), _month_start(now, months_ahead + 1)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_partition_name(start)} PARTITION OF notification_archive "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+
+
+def drop_expired_archive_partitions(db, now: datetime, keep_months: int) -> List[str]:
+    """Drop archive partitions for months before the last `keep_months`; return their names."""
+    oldest_kept = _partition_name(_month_start(now, -keep_months))
+    partitions = db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'notification_archive'::regclass"
+    )).all()
+    # YYYYMM suffixes sort chronologically
+    expired = sorted(name for name in partitions if name.startswith(_PARTITION_PREFIX) and name < oldest_kept)
+    for name in expired:
+        db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    return expired
+
+
+def _remove_batch(db, is_read: bool, cutoff: datetime, batch_size: int, archive: bool) -> int:
+    notifications = Notification.__table__
+    expired_ids = (
+        select(notifications.c.id)
+        .where(notifications.c.is_read.is_(is_read), notifications.c.created_at < cutoff)
+        .order_by(notifications.c.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    removed = delete(notifications).where(notifications.c.id.in_(expired_ids))
+    if archive:
+        moved = removed.returning(*(notifications.c[name] for name in _ARCHIVED_COLUMNS)).cte("moved")
+        rows = db.execute(
+            insert(notification_archive)
+            .from_select(_ARCHIVED_COLUMNS, select(*(moved.c[name] for name in _ARCHIVED_COLUMNS)))
+            .returning(notification_archive.c.user_id, notification_archive.c.is_read)
+        ).all()
+    else:
+        rows = db.execute(removed.returning(notifications.c.user_id, notifications.c.is_read)).all()
+    if not rows:
+        return 0
+
+    for user_id, count in Counter(row.user_id for row in rows if not row.is_read).items():
+        record_unread(db, user_id, -count)
+    invalidate_notifications(db, {row.user_id for row in rows})
+    return len(rows)
+
+
+def purge_notifications(
+    batch_size: int = settings.notification_retention_batch_size,
+    pause_seconds: float = settings.notification_retention_pause_seconds,
+    mode: Optional[str] = None,
+) -> Dict[str, int]:
+    """Archive or delete notifications past retention; return rows removed and partitions dropped."""
+    archive = (mode or settings.notification_retention_mode) == "archive"
+    now = datetime.now(timezone.utc)
+    result = {"read": 0, "unread": 0, "partitions_dropped": 0}
+    started = time.monotonic()
+    try:
+        if archive:
+            with SessionLocal() as db:
+                ensure_archive_partitions(db, now)
+                db.commit()
+
+        for kind, is_read, days in (
+            ("read", True, settings.notification_retention_read_days),
+            ("unread", False, settings.notification_retention_unread_days),
+        ):
+            cutoff = now - timedelta(days=days)
+            while True:
+                # One short transaction per batch keeps row locks brief
+                with SessionLocal() as db:
+                    removed = _remove_batch(db, is_read, cutoff, batch_size, archive)
+                    db.commit()
+                result[kind] += removed
+                _stats["archived" if archive else "deleted"] += removed
+                if removed < batch_size:
+                    break
+                time.sleep(pause_seconds)
+
+        if settings.notification_archive_retention_months > 0:
+            with SessionLocal() as db:
+                dropped = drop_expired_archive_partitions(db, now, settings.notification_archive_retention_months)
+                db.commit()
+            result["partitions_dropped"] = len(dropped)
+            _stats["partitions_dropped"] += len(dropped)
+    except Exception:
+        _stats["errors"] += 1
+        raise
+    finally:
+        _stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+    logger.info(
+        "notification retention %s %d read and %d unread rows, dropped %d archive partitions in %.2fs",
+        "archived" if archive else "deleted", result["read"], result["unread"],
+        result["partitions_dropped"], time.monotonic() - started,
+    )
+    return result
+
+
+def notification_retention_stats() -> Dict[str, Any]:
+    return dict(_stats, mode=settings.notification_retention_mode)
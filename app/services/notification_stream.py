@@ -0,0 +1,158 @@
+"""Live notification delivery for GET /notifications/stream.
+
+The outbox worker calls `publish_notifications` once a batch is committed.
+With `notification_stream_backend = "redis"`, messages go through Redis
+pub/sub on one channel per user, so every app process receives them. With
+"local", delivery is in process only (a single worker, or no Redis).
+
+Each process keeps a single pub/sub connection, subscribed only to users with
+a stream open, and fans messages out to per-connection queues. An idle stream
+is one suspended coroutine and an empty queue. A stream that falls
+`notification_stream_queue_size` messages behind is closed; the client
+reconnects with Last-Event-ID and replays the gap from the database.
+"""
+import asyncio
+import json
+import logging
+import resource
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+from app.core.pagination import encode_cursor
+from app.core.redis import get_async_redis, log_redis_error, run_pipeline
+from app.schemas import NotificationOut
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL_PREFIX = "notifications:"
+
+
+def _channel(user_id) -> str:
+    return f"{_CHANNEL_PREFIX}{user_id}"
+
+
+def stream_message(notification) -> Dict[str, Any]:
+    """SSE message for a notification; its id is the keyset cursor used to resume."""
+    return {
+        "id": encode_cursor(notification.created_at, notification.id),
+        "notification_id": str(notification.id),
+        "data": NotificationOut.model_validate(notification, from_attributes=True).model_dump_json(),
+    }
+
+
+class NotificationBroker:
+    def __init__(self):
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._stats = {"published": 0, "delivered": 0, "dropped_streams": 0, "errors": 0}
+
+    @property
+    def uses_redis(self) -> bool:
+        return settings.notification_stream_backend == "redis"
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self.uses_redis:
+            self._pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+
+    @asynccontextmanager
+    async def subscribe(self, user_id) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving the user's messages while the block runs; None means the stream fell behind."""
+        key = str(user_id)
+        queue = asyncio.Queue(maxsize=settings.notification_stream_queue_size)
+        queues = self._queues.setdefault(key, set())
+        queues.add(queue)
+        try:
+            if len(queues) == 1 and self._pubsub is not None:
+                await self._pubsub.subscribe(_channel(key))
+            yield queue
+        finally:
+            queues.discard(queue)
+            if not queues:
+                self._queues.pop(key, None)
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.unsubscribe(_channel(key))
+                    except Exception:
+                        log_redis_error(logger, "notification stream: unsubscribe failed")
+
+    def publish(self, user_id, message: Dict[str, Any]) -> None:
+        self.publish_many([(user_id, message)])
+
+    def publish_many(self, messages: Iterable) -> None:
+        """Publish (user_id, message) pairs; safe to call from worker threads and the event loop."""
+        messages = list(messages)
+        if not messages:
+            return
+        self._stats["published"] += len(messages)
+        if self.uses_redis:
+            def build(pipe):
+                for user_id, message in messages:
+                    pipe.publish(_channel(user_id), json.dumps(message))
+
+            run_pipeline(build, self._publish_failed)
+        elif self._loop is not None:
+            self._loop.call_soon_threadsafe(self._deliver_all, messages)
+
+    def _publish_failed(self) -> None:
+        self._stats["errors"] += 1
+        log_redis_error(logger, "notification stream: redis publish failed")
+
+    def _deliver_all(self, messages) -> None:
+        for user_id, message in messages:
+            self._deliver(str(user_id), message)
+
+    def _deliver(self, user_id: str, message: Dict[str, Any]) -> None:
+        for queue in self._queues.get(user_id, ()):
+            try:
+                queue.put_nowait(message)
+                self._stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # Slow consumer: end its stream instead of buffering without bound
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                self._stats["dropped_streams"] += 1
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.1)
+                    continue
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    self._deliver(message["channel"][len(_CHANNEL_PREFIX):], json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._stats["errors"] += 1
+                log_redis_error(logger, "notification stream: redis listener failed")
+                await asyncio.sleep(1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self._stats,
+            backend=settings.notification_stream_backend,
+            users=len(self._queues),
+            streams=sum(len(queues) for queues in self._queues.values()),
+            max_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        )
+
+
+notification_broker = NotificationBroker()
+
+
+def publish_notifications(notifications: Iterable) -> None:
+    notification_broker.publish_many((n.user_id, stream_message(n)) for n in notifications)
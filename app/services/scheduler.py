@@ -0,0 +1,19 @@
+import asyncio
+import logging
+from typing import Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable, *args) -> None:
+    """Run a blocking job in the threadpool every `interval_seconds` until cancelled."""
+    while True:
+        try:
+            await run_in_threadpool(job, *args)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("background job %s failed", name)
+        await asyncio.sleep(interval_seconds)
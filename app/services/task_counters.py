@@ -0,0 +1,86 @@
+"""Per-project task counts by status, kept in project_task_counters.
+
+Task writers call `adjust_task_count` in the same transaction as the task
+change, so the counters commit or roll back with it and `task_status_counts`
+answers the status report without scanning tasks. Writes that bypass the
+routers (seed data, manual SQL) leave drift behind; `reconcile_task_counters`
+recomputes the counters from the tasks table.
+"""
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Task, project_task_counters
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _status_value(status) -> str:
+    return getattr(status, "value", status)
+
+
+async def adjust_task_count(db: AsyncSession, project_id, status, delta: int) -> None:
+    """Add `delta` to the (project, status) counter; not committed here."""
+    stmt = insert(project_task_counters).values(project_id=project_id, status=_status_value(status), count=delta)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[project_task_counters.c.project_id, project_task_counters.c.status],
+        set_={"count": project_task_counters.c.count + stmt.excluded.count},
+    ))
+
+
+async def move_task_count(db: AsyncSession, project_id, old_status, new_status) -> None:
+    if _status_value(old_status) != _status_value(new_status):
+        await adjust_task_count(db, project_id, old_status, -1)
+        await adjust_task_count(db, project_id, new_status, 1)
+
+
+async def task_status_counts(db: AsyncSession, project_id) -> Dict[str, int]:
+    rows = await db.execute(
+        select(project_task_counters.c.status, project_task_counters.c.count)
+        .where(project_task_counters.c.project_id == project_id, project_task_counters.c.count > 0)
+    )
+    return {_status_value(status): count for status, count in rows}
+
+
+def reconcile_task_counters(fix: bool = True) -> List[Tuple[str, str, int, int]]:
+    """Recompute counters from tasks; return drift as (project_id, status, counted, actual) rows.
+
+    With `fix`, the counters table is locked against writers for the
+    duration, so request transactions queue their increments behind the
+    rebuild instead of racing it.
+    """
+    with SessionLocal() as db:
+        if fix:
+            db.execute(text("LOCK TABLE project_task_counters IN EXCLUSIVE MODE"))
+        counted = {
+            (project_id, _status_value(status)): count
+            for project_id, status, count in db.execute(select(
+                project_task_counters.c.project_id, project_task_counters.c.status, project_task_counters.c.count,
+            ))
+        }
+        actual = {
+            (project_id, _status_value(status)): count
+            for project_id, status, count in db.execute(
+                select(Task.project_id, Task.status, func.count()).group_by(Task.project_id, Task.status)
+            )
+        }
+        drift = sorted(
+            (str(project_id), status, counted.get((project_id, status), 0), actual.get((project_id, status), 0))
+            for project_id, status in counted.keys() | actual.keys()
+            if counted.get((project_id, status), 0) != actual.get((project_id, status), 0)
+        )
+        if fix and drift:
+            db.execute(delete(project_task_counters))
+            if actual:
+                db.execute(insert(project_task_counters), [
+                    {"project_id": project_id, "status": status, "count": count}
+                    for (project_id, status), count in actual.items()
+                ])
+        db.commit()
+
+    logger.info("task counter reconciliation found %d drifted counters%s", len(drift), " (fixed)" if fix and drift else "")
+    return drift
@@ -0,0 +1,47 @@
+import logging
+import time
+
+from sqlalchemy import delete, func, select
+
+from app.models import RefreshToken
+from config import settings
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _delete_expired_batch(db, batch_size: int) -> int:
+    # SKIP LOCKED: rows a concurrent login/refresh is deleting are left for later,
+    # so the sweeper never waits on (or blocks) request transactions
+    expired_ids = (
+        select(RefreshToken.id)
+        .where(RefreshToken.expires_at < func.now())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        delete(RefreshToken).where(RefreshToken.id.in_(expired_ids)),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
+
+
+def sweep_expired_refresh_tokens(
+    batch_size: int = settings.refresh_token_sweep_batch_size,
+    pause_seconds: float = settings.refresh_token_sweep_pause_seconds,
+) -> int:
+    """Delete expired refresh tokens in short batches; return rows removed."""
+    total = 0
+    started = time.monotonic()
+    while True:
+        # One short transaction per batch keeps row locks brief
+        with SessionLocal() as db:
+            deleted = _delete_expired_batch(db, batch_size)
+            db.commit()
+        total += deleted
+        if deleted < batch_size:
+            break
+        time.sleep(pause_seconds)
+    logger.info("refresh token sweep removed %d rows in %.2fs", total, time.monotonic() - started)
+    return total
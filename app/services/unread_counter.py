@@ -0,0 +1,104 @@
+"""Per-user unread notification counts kept in Redis.
+
+Writers call `record_unread` in the transaction that creates notifications or
+marks them read. After the commit, in one pipelined round trip that does not
+block the event loop, each affected user's counter is deleted and their fill
+generation bumped; on rollback nothing is sent. `unread_count` fills a missing
+counter from the partial index on unread rows, but only if the generation it
+read before counting is still current. A count taken before a concurrent
+commit therefore never overwrites the invalidation that commit sent, and a
+count taken after the commit but before its invalidation is deleted by it.
+"""
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import event, false, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_async_redis, log_redis_error, run_pipeline
+from app.models import Notification
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+# SET only if no commit invalidated the counter since the caller read the generation
+_FILL_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '') == ARGV[1] then
+    return redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3], 'NX')
+end
+return nil
+"""
+
+
+def _key(user_id) -> str:
+    return f"user:{user_id}:notifications:unread"
+
+
+def _generation_key(user_id) -> str:
+    return f"user:{user_id}:notifications:unread:gen"
+
+
+def record_unread(db, user_id, delta: int) -> None:
+    """Invalidate the user's unread count once the session commits, if `delta` changes it."""
+    if delta:
+        db.info.setdefault("unread_users", set()).add(str(user_id))
+
+
+async def unread_count(db: AsyncSession, user_id) -> int:
+    key, generation_key = _key(user_id), _generation_key(user_id)
+    try:
+        cached, generation = await get_async_redis().mget(key, generation_key)
+    except Exception:
+        _stats["errors"] += 1
+        log_redis_error(logger, "unread counter: redis get failed")
+        cached = generation = None
+    if cached is not None:
+        _stats["hits"] += 1
+        return max(int(cached), 0)
+
+    _stats["misses"] += 1
+    count = await db.scalar(
+        select(func.count())
+        .select_from(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read == false())
+    )
+    try:
+        await get_async_redis().eval(
+            _FILL_IF_CURRENT, 2, key, generation_key, generation or "", count, settings.unread_count_ttl_seconds,
+        )
+    except Exception:
+        _stats["errors"] += 1
+        log_redis_error(logger, "unread counter: redis set failed")
+    return count
+
+
+def unread_counter_stats() -> Dict[str, Any]:
+    return dict(_stats)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    user_ids = session.info.pop("unread_users", None)
+    if not user_ids:
+        return
+
+    def build(pipe):
+        for user_id in user_ids:
+            pipe.incr(_generation_key(user_id))
+            # Outlives any fill in flight; an expired generation only costs one more COUNT
+            pipe.expire(_generation_key(user_id), settings.unread_count_ttl_seconds)
+            pipe.delete(_key(user_id))
+
+    def on_error():
+        _stats["errors"] += 1
+        log_redis_error(logger, "unread counter: redis update failed")
+
+    run_pipeline(build, on_error)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("unread_users", None)
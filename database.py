@@ -1,15 +1,62 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from config import settings
 from app.models import BaseModel
+from app.core.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.core.query_stats import instrument_engine
+
+
+POOL_OPTIONS = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+)
+
+
+def _asyncpg_url(url: str) -> str:
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
 
 # Create database engine
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: a request's single commit is its last use of the loaded rows,
+# so reloading them afterwards would only cost extra SELECTs
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine (asyncpg) used by the async routers
+async_engine = create_async_engine(
+    settings.async_database_url or _asyncpg_url(settings.database_url),
+    poolclass=InstrumentedAsyncQueuePool,
+    **POOL_OPTIONS,
+)
+
+# expire_on_commit=False: attributes must stay loaded for response serialization,
+# which runs outside the session's greenlet and cannot lazy-load
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Read replica (async only: the read-only handlers are async); None when not configured
+async_replica_engine = None
+if settings.database_replica_url or settings.async_database_replica_url:
+    async_replica_engine = create_async_engine(
+        settings.async_database_replica_url or _asyncpg_url(settings.database_replica_url),
+        poolclass=InstrumentedAsyncQueuePool,
+        **POOL_OPTIONS,
+    )
+
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine or async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Per-request statement counting and timing (app.core.query_stats)
+for _engine in (engine, async_engine, async_replica_engine):
+    if _engine is not None:
+        instrument_engine(getattr(_engine, "sync_engine", _engine))
 
 # Create base class for models
 Base = declarative_base()
@@ -22,6 +69,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def test_database_connection():
+    """Check that the database is reachable"""
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"Database connection error: {e}")
+        return False
+
 def create_tables():
     """Create all database tables"""
     BaseModel.metadata.create_all(bind=engine)
@@ -0,0 +1,103 @@
+# scripts/bench_async_vs_sync.py
+"""Benchmark the sync engine (thread pool) against the async engine (asyncpg).
+
+Runs the query behind get_task_for_user (task fetch plus membership EXISTS) at
+a fixed concurrency through both paths and reports throughput and latency
+percentiles. Both engines share the pool settings from
+config, so the numbers compare driver/concurrency models, not pool sizes.
+
+    python scripts/bench_async_vs_sync.py --requests 5000 --concurrency 50
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import exists, select
+
+from app.models import Task, project_members
+from database import AsyncSessionLocal, SessionLocal, async_engine
+
+
+def _statement(task_id, user_id):
+    is_member = (
+        exists()
+        .where(project_members.c.project_id == Task.project_id, project_members.c.user_id == user_id)
+        .label("is_member")
+    )
+    return select(Task, is_member).where(Task.id == task_id)
+
+
+def _sample_ids():
+    with SessionLocal() as db:
+        row = db.execute(
+            select(Task.id, project_members.c.user_id)
+            .join(project_members, project_members.c.project_id == Task.project_id)
+            .limit(1)
+        ).first()
+    if row is None:
+        raise SystemExit("Need at least one task in a project with members to benchmark")
+    return row
+
+
+def _summary(name, timings, elapsed):
+    timings.sort()
+    return {
+        "mode": name,
+        "rps": len(timings) / elapsed,
+        "p50_ms": statistics.median(timings),
+        "p99_ms": timings[int(len(timings) * 0.99) - 1],
+    }
+
+
+def run_sync(task_id, user_id, requests: int, concurrency: int):
+    def one(_):
+        start = time.perf_counter()
+        with SessionLocal() as db:
+            db.execute(_statement(task_id, user_id)).first()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(one, range(requests)))
+    return _summary("sync", timings, time.perf_counter() - start)
+
+
+async def run_async(task_id, user_id, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                (await db.execute(_statement(task_id, user_id))).first()
+            return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    timings = list(await asyncio.gather(*(one() for _ in range(requests))))
+    elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+    return _summary("async", timings, elapsed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sync vs async engine benchmark')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    task_id, user_id = _sample_ids()
+    results = [
+        run_sync(task_id, user_id, args.requests, args.concurrency),
+        asyncio.run(run_async(task_id, user_id, args.requests, args.concurrency)),
+    ]
+
+    print(f"{'mode':<6} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['rps']:>10.1f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f}")
@@ -0,0 +1,95 @@
+# scripts/bench_refresh_tokens.py
+"""Benchmark refresh-token lookups: full JWT text key vs fixed-width digest.
+
+Seeds two scratch tables with the same N tokens, one keyed by the raw token
+(the old layout) and one by its SHA-256 hex digest (the current layout), then
+reports unique-index size and point-lookup latency for each.
+
+    python scripts/bench_refresh_tokens.py --rows 1000000 --lookups 5000
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from database import engine
+
+# Refresh JWTs share a long common prefix (header + start of payload), which is
+# what makes comparisons on the raw string expensive; mimic that shape.
+TOKEN_EXPR = (
+    "'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiI' "
+    "|| md5(i::text) || md5((i * 7)::text) || md5((i * 13)::text) "
+    "|| '.' || md5((i * 31)::text) || md5((i * 37)::text)"
+)
+
+LAYOUTS = {
+    "text": ("bench_rt_text", "token text NOT NULL", "token", TOKEN_EXPR),
+    "digest": ("bench_rt_digest", "token_hash varchar(64) NOT NULL", "token_hash",
+               f"encode(digest({TOKEN_EXPR}, 'sha256'), 'hex')"),
+}
+
+
+def seed(conn, rows: int):
+    for table, column_def, column, expr in LAYOUTS.values():
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(f"CREATE TABLE {table} (id bigint PRIMARY KEY, {column_def})"))
+        conn.execute(text(f"INSERT INTO {table} SELECT i, {expr} FROM generate_series(1, :n) AS i"), {"n": rows})
+        conn.execute(text(f"CREATE UNIQUE INDEX {table}_key ON {table} ({column})"))
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+def measure(conn, rows: int, lookups: int):
+    ids = [random.randint(1, rows) for _ in range(lookups)]
+    results = {}
+    for name, (table, _, column, _) in LAYOUTS.items():
+        keys = [conn.execute(text(f"SELECT {column} FROM {table} WHERE id = :id"), {"id": i}).scalar() for i in ids]
+        index_size = conn.execute(text(f"SELECT pg_relation_size('{table}_key')")).scalar()
+        query = text(f"SELECT id FROM {table} WHERE {column} = :k")
+        timings = []
+        for key in keys:
+            start = time.perf_counter()
+            conn.execute(query, {"k": key}).scalar()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {
+            "index_mb": index_size / (1024 * 1024),
+            "p50_ms": statistics.median(timings),
+            "p99_ms": timings[int(len(timings) * 0.99) - 1],
+            "mean_ms": statistics.fmean(timings),
+        }
+    return results
+
+
+def drop(conn):
+    for table, *_ in LAYOUTS.values():
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Refresh token lookup benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch tables')
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pgcrypto"))
+        print(f"Seeding {args.rows} rows per layout...")
+        seed(conn, args.rows)
+
+    with engine.connect() as conn:
+        results = measure(conn, args.rows, args.lookups)
+
+    print(f"{'layout':<8} {'index MB':>10} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['index_mb']:>10.1f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['mean_ms']:>8.3f}")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            drop(conn)
@@ -8,6 +8,11 @@ from alembic.config import Config
 from alembic import command
 from database import engine, test_database_connection
 from app.models import BaseModel
+from app.services.token_sweeper import sweep_expired_refresh_tokens
+from app.services.task_counters import reconcile_task_counters
+from app.services.due_date_notifier import notify_due_tasks
+from app.services.notification_outbox import drain_notification_outbox
+from app.services.notification_retention import purge_notifications
 
 def create_migration(message: str):
     """Create new migration"""
@@ -42,13 +47,45 @@ def current_version():
     alembic_cfg = Config("alembic.ini")
     command.current(alembic_cfg, verbose=True)
 
+def sweep_tokens(batch_size: int):
+    """Delete expired refresh tokens in batches"""
+    removed = sweep_expired_refresh_tokens(batch_size=batch_size)
+    print(f"Removed {removed} expired refresh tokens")
+
+def reconcile_counters(dry_run: bool):
+    """Recompute per-project task status counters and report drift"""
+    drift = reconcile_task_counters(fix=not dry_run)
+    for project_id, status, counted, actual in drift:
+        print(f"{project_id} {status}: counter={counted} tasks={actual}")
+    action = "found" if dry_run else "fixed"
+    print(f"{len(drift)} drifted counters {action}")
+
+def notify_due(batch_size: int):
+    """Send due-soon and overdue task notifications once"""
+    sent = notify_due_tasks(batch_size=batch_size)
+    print(f"Sent {sent['due_soon']} due-soon and {sent['overdue']} overdue notifications")
+
+def drain_outbox(batch_size: int):
+    """Write all queued notifications from the outbox"""
+    drained = drain_notification_outbox(batch_size=batch_size)
+    print(f"Drained {drained} queued notifications")
+
+def purge_old_notifications(batch_size: int, mode: str):
+    """Archive or delete notifications past the retention period"""
+    result = purge_notifications(batch_size=batch_size, mode=mode)
+    print(f"Removed {result['read']} read and {result['unread']} unread notifications, "
+          f"dropped {result['partitions_dropped']} archive partitions")
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='Database Management')
-    parser.add_argument('action', choices=['upgrade', 'downgrade', 'history', 'current', 'create'])
+    parser.add_argument('action', choices=['upgrade', 'downgrade', 'history', 'current', 'create', 'sweep-tokens', 'reconcile-counters', 'notify-due', 'drain-outbox', 'purge-notifications'])
     parser.add_argument('--message', '-m', help='Migration message for create action')
     parser.add_argument('--revision', '-r', help='Revision for downgrade', default='-1')
+    parser.add_argument('--batch-size', type=int, help='Batch size for sweep-tokens, notify-due, drain-outbox and purge-notifications', default=1000)
+    parser.add_argument('--mode', choices=['archive', 'delete'], help='Override notification_retention_mode for purge-notifications')
+    parser.add_argument('--dry-run', action='store_true', help='Only report drift for reconcile-counters')
     
     args = parser.parse_args()
     
@@ -64,4 +101,14 @@ if __name__ == "__main__":
         if not args.message:
             print("Please provide migration message with --message")
             sys.exit(1)
-        create_migration(args.message)
\ No newline at end of file
+        create_migration(args.message)
+    elif args.action == 'sweep-tokens':
+        sweep_tokens(args.batch_size)
+    elif args.action == 'reconcile-counters':
+        reconcile_counters(args.dry_run)
+    elif args.action == 'notify-due':
+        notify_due(args.batch_size)
+    elif args.action == 'drain-outbox':
+        drain_outbox(args.batch_size)
+    elif args.action == 'purge-notifications':
+        purge_old_notifications(args.batch_size, args.mode)
\ No newline at end of file
@@ -0,0 +1,162 @@
+# scripts/load_sse.py
+"""Load test for GET /notifications/stream: many idle SSE connections on one worker.
+
+Opens --connections streams (raw sockets, so the client stays cheap), spread
+over the first --users users of the database, and keeps them idle for --hold
+seconds. It reports connect latency, streams held and the server's own view
+from /diagnostics/metrics (open streams, max RSS; needs diagnostics_enabled and
+an admin user in the database). With --publish, it then pushes
+test messages through the Redis broker channels and measures delivery
+latency across every stream (needs notification_stream_backend = "redis").
+Run one server worker against the same database and Redis:
+
+    uvicorn app.main:app --workers 1 --backlog 4096
+    python scripts/load_sse.py --connections 20000 --users 500 --publish 20
+
+Both sides need `ulimit -n` above the connection count.
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import time
+import urllib.request
+import uuid
+from urllib.parse import urlparse
+
+from sqlalchemy import select
+
+from app.core.security import create_access_token
+from app.core.redis import get_async_redis
+from app.models import User
+from database import SessionLocal
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+async def open_stream(host, port, token):
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f"GET /notifications/stream HTTP/1.1\r\nHost: {host}\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        writer.close()
+        raise RuntimeError(status.decode().strip())
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass
+    return reader, writer, time.perf_counter() - started
+
+
+async def wait_for_messages(reader, count, sent_at, latencies):
+    seen = 0
+    while seen < count:
+        line = await reader.readline()
+        if not line:
+            return
+        if line.startswith(b"data: "):
+            data = json.loads(line[6:])
+            latencies.append(time.time() - sent_at[data["seq"]])
+            seen += 1
+
+
+def load_user_ids(count):
+    with SessionLocal() as db:
+        return [str(user_id) for user_id in db.scalars(select(User.id).where(User.is_active.is_(True)).limit(count))]
+
+
+def load_admin_token():
+    with SessionLocal() as db:
+        admin_id = db.scalar(select(User.id).where(User.role == "admin", User.is_active.is_(True)).limit(1))
+    return create_access_token(str(admin_id)) if admin_id else None
+
+
+def server_metrics(base_url, admin_token):
+    if admin_token is None:
+        return "unavailable (no admin user)"
+    request = urllib.request.Request(
+        f"{base_url}/diagnostics/metrics", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response).get("notification_stream")
+
+
+async def main(args):
+    url = urlparse(args.base_url)
+    users = load_user_ids(args.users)
+    if not users:
+        sys.exit("no users in the database")
+    tokens = {user: create_access_token(user) for user in users}
+    admin_token = load_admin_token()
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def connect(i):
+        async with limit:
+            user = users[i % len(users)]
+            return user, await open_stream(url.hostname, url.port or 80, tokens[user])
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(connect(i) for i in range(args.connections)), return_exceptions=True)
+    streams = [result for result in results if not isinstance(result, Exception)]
+    errors = [result for result in results if isinstance(result, Exception)]
+    connect_times = sorted(stream[1][2] for stream in streams)
+    print(f"opened {len(streams)}/{args.connections} streams in {time.perf_counter() - started:.1f}s, {len(errors)} errors")
+    if errors:
+        print(f"  first error: {errors[0]!r}")
+    if connect_times:
+        p99 = connect_times[int(len(connect_times) * 0.99) - 1]
+        print(f"connect p50 {statistics.median(connect_times) * 1000:.1f}ms p99 {p99 * 1000:.1f}ms")
+
+    await asyncio.sleep(args.hold)
+    print(f"server after {args.hold}s idle: {server_metrics(args.base_url, admin_token)}")
+
+    if args.publish and streams:
+        # Published straight to the broker's per-user channels, as the outbox worker does
+        redis = get_async_redis()
+        sent_at, latencies = {}, []
+        waiters = [
+            asyncio.create_task(wait_for_messages(reader, args.publish, sent_at, latencies))
+            for _, (reader, _, _) in streams
+        ]
+        for seq in range(args.publish):
+            sent_at[seq] = time.time()
+            message = {"id": f"load-{seq}", "notification_id": str(uuid.uuid4()), "data": json.dumps({"seq": seq})}
+            for user in users:
+                await redis.publish(f"notifications:{user}", json.dumps(message))
+            await asyncio.sleep(args.publish_interval)
+        await asyncio.wait(waiters, timeout=30)
+        expected = len(streams) * args.publish
+        print(f"delivered {len(latencies)}/{expected} messages")
+        if latencies:
+            latencies.sort()
+            print(f"delivery p50 {statistics.median(latencies) * 1000:.1f}ms p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms")
+
+    for _, (_, writer, _) in streams:
+        writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE notification stream load test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100, help="distinct users to spread streams over")
+    parser.add_argument("--concurrency", type=int, default=500, help="connections opened at once")
+    parser.add_argument("--hold", type=float, default=10, help="seconds to keep streams idle")
+    parser.add_argument("--publish", type=int, default=0, help="test messages to push to every user")
+    parser.add_argument("--publish-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"fd limit {raise_fd_limit()}")
+    asyncio.run(main(args))
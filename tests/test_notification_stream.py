@@ -0,0 +1,37 @@
+"""Resuming the notification stream from Last-Event-ID replays every missed row."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.pagination import encode_cursor
+from app.models import Notification
+from app.routers.noti import _event_stream
+from config import settings
+
+
+def test_replay_pages_past_max_limit(client, db, project_task):
+    user, task = project_task["member"], project_task["task"]
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    notifications = [
+        Notification(
+            user_id=user.id, task_id=task.id, title=f"n{i}", message="m",
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(settings.pagination_max_limit * 2 + 5)
+    ]
+    db.add_all(notifications)
+    db.commit()
+    seen, missed = notifications[0], notifications[1:]
+
+    async def replay():
+        stream = _event_stream(user.id, encode_cursor(seen.created_at, seen.id))
+        try:
+            # A replay that stops short would otherwise wait for live events forever
+            return [await asyncio.wait_for(stream.__anext__(), 5) for _ in missed]
+        finally:
+            await stream.aclose()
+
+    # On the client's event loop, where the async engine's connections live
+    events = client.portal.call(replay)
+    assert [event.split("\n")[0] for event in events] == [
+        f"id: {encode_cursor(n.created_at, n.id)}" for n in missed
+    ]
@@ -0,0 +1,193 @@
+"""EXPLAIN regression tests for the hot read queries.
+
+A synthetic dataset is seeded inside a transaction that is rolled back
+afterwards. Each statement the routers issue is prepared and explained under
+both a custom plan (parameters known, as with psycopg2) and a generic plan (as
+asyncpg's cached prepared statements may use). A sequential scan on the
+query's main table fails the test. A partial index whose predicate compares
+with a bound parameter, for example, cannot serve a generic plan.
+
+Needs TEST_DATABASE_URL pointing at PostgreSQL; skipped otherwise.
+"""
+import enum
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import exists, false, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.models import Notification, Project, Task, TaskComment, User, project_members
+
+SEED_TASKS = 20_000
+
+# Statements are compiled as the async handlers send them: $n parameters with casts
+_asyncpg_dialect = asyncpg.dialect()
+
+
+def seed(conn, tasks: int):
+    users = max(tasks // 100, 100)
+    projects = max(tasks // 400, 50)
+    conn.execute(text("INSERT INTO organizations (name) VALUES ('plan-check')"))
+    conn.execute(text("""
+        INSERT INTO users (email, hash_password, full_name, gender, role, organization_id)
+        SELECT 'plan-check-' || i || '@example.com', 'x', 'User ' || i, 'male', 'member',
+               (SELECT id FROM organizations WHERE name = 'plan-check')
+        FROM generate_series(1, :n) AS i
+    """), {"n": users})
+    conn.execute(text("""
+        INSERT INTO projects (name, organization_id)
+        SELECT 'plan-check-' || i, (SELECT id FROM organizations WHERE name = 'plan-check')
+        FROM generate_series(1, :n) AS i
+    """), {"n": projects})
+    conn.execute(text("""
+        CREATE TEMP TABLE plan_users ON COMMIT DROP AS
+        SELECT id, row_number() OVER () AS n FROM users WHERE email LIKE 'plan-check-%'
+    """))
+    conn.execute(text("""
+        CREATE TEMP TABLE plan_projects ON COMMIT DROP AS
+        SELECT id, row_number() OVER () AS n FROM projects WHERE name LIKE 'plan-check-%'
+    """))
+    # every user joins 5 projects
+    conn.execute(text("""
+        INSERT INTO project_members (project_id, user_id)
+        SELECT DISTINCT p.id, u.id
+        FROM plan_users u
+        CROSS JOIN generate_series(0, 4) AS k
+        JOIN plan_projects p ON p.n = 1 + (u.n * 7 + k * 13) % :projects
+    """), {"projects": projects})
+    conn.execute(text("""
+        INSERT INTO tasks (title, status, priority, due_date, project_id, assignee_id, created_by)
+        SELECT 'task ' || i,
+               (ARRAY['todo', 'in_progress', 'done'])[1 + i % 3]::taskstatus,
+               (ARRAY['low', 'medium', 'high'])[1 + i % 3]::taskpriority,
+               now() - (i % 120 - 60) * interval '1 day',
+               p.id, u.id, u.id
+        FROM generate_series(1, :n) AS i
+        JOIN plan_projects p ON p.n = 1 + i % :projects
+        JOIN plan_users u ON u.n = 1 + i % :users
+    """), {"n": tasks, "projects": projects, "users": users})
+    conn.execute(text("""
+        INSERT INTO notifications (type, title, message, user_id, task_id, is_read, created_at)
+        SELECT 'task_assigned', 'Task Assigned', 'msg', t.assignee_id, t.id, i > 1, now() - i * interval '1 minute'
+        FROM tasks t
+        CROSS JOIN generate_series(1, 3) AS i
+        WHERE t.title LIKE 'task %'
+    """))
+    conn.execute(text("""
+        INSERT INTO task_comments (content, task_id, user_id, created_at)
+        SELECT 'comment', t.id, t.created_by, now() - i * interval '1 minute'
+        FROM tasks t
+        CROSS JOIN generate_series(1, 2) AS i
+        WHERE t.title LIKE 'task %'
+    """))
+    for table in ("users", "projects", "project_members", "tasks", "notifications", "task_comments"):
+        conn.execute(text(f"ANALYZE {table}"))
+
+
+def hot_queries(conn):
+    """name -> (statement, table that must not be seq-scanned), mirroring the routers."""
+    user_id, project_id, organization_id = conn.execute(text("""
+        SELECT u.id, pm.project_id, u.organization_id
+        FROM users u JOIN project_members pm ON pm.user_id = u.id
+        WHERE u.email LIKE 'plan-check-%' LIMIT 1
+    """)).one()
+    task_id = conn.execute(select(Task.id).where(Task.project_id == project_id).limit(1)).scalar_one()
+    now = datetime.now(timezone.utc)
+
+    return {
+        "get_my_notifications": (
+            select(Notification).where(Notification.user_id == user_id).order_by(Notification.created_at.desc()),
+            "notifications",
+        ),
+        "unread_count": (
+            select(func.count()).select_from(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read == false()),
+            "notifications",
+        ),
+        "overdue_tasks": (
+            select(Task).where(
+                Task.project_id == project_id, Task.due_date < now, Task.status != literal_column("'done'"),
+            ),
+            "tasks",
+        ),
+        "get_task_comments": (
+            select(TaskComment).where(TaskComment.task_id == task_id).order_by(TaskComment.created_at.asc()),
+            "task_comments",
+        ),
+        "tasks_by_assignee": (
+            select(Task.id).where(Task.assignee_id == user_id),
+            "tasks",
+        ),
+        "get_projects (member)": (
+            select(Project.id).join(Project.members)
+            .where(Project.organization_id == organization_id, User.id == user_id),
+            "project_members",
+        ),
+        "get_task_for_user": (
+            select(Task, exists().where(project_members.c.project_id == Task.project_id,
+                                        project_members.c.user_id == user_id).label("is_member"))
+            .where(Task.id == task_id),
+            "tasks",
+        ),
+    }
+
+
+HOT_QUERIES = [
+    "get_my_notifications", "unread_count", "overdue_tasks", "get_task_comments",
+    "tasks_by_assignee", "get_projects (member)", "get_task_for_user",
+]
+
+
+def seq_scans(plan, table):
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == table:
+        found.append(plan)
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, table))
+    return found
+
+
+def _driver_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def explain(conn, statement, plan_cache_mode: str):
+    compiled = statement.compile(dialect=_asyncpg_dialect)
+    params = compiled.construct_params()
+    values = tuple(_driver_value(params[name]) for name in compiled.positiontup or ())
+    conn.exec_driver_sql(f"SET LOCAL plan_cache_mode = {plan_cache_mode}")
+    conn.exec_driver_sql(f"PREPARE plan_check AS {compiled}")
+    try:
+        if values:
+            placeholders = ", ".join(["%s"] * len(values))
+            result = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) EXECUTE plan_check({placeholders})", values)
+        else:
+            result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) EXECUTE plan_check")
+        return result.scalar()[0]["Plan"]
+    finally:
+        conn.exec_driver_sql("DEALLOCATE plan_check")
+
+
+@pytest.fixture(scope="module")
+def seeded(database):
+    if database.dialect.name != "postgresql":
+        pytest.skip("query plans need PostgreSQL")
+    with database.connect() as conn:
+        transaction = conn.begin()
+        seed(conn, SEED_TASKS)
+        yield conn, hot_queries(conn)
+        transaction.rollback()
+
+
+@pytest.mark.parametrize("plan_cache_mode", ["force_custom_plan", "force_generic_plan"])
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_no_seq_scan(seeded, name, plan_cache_mode):
+    conn, queries = seeded
+    statement, table = queries[name]
+    plan = explain(conn, statement, plan_cache_mode)
+    assert not seq_scans(plan, table), f"{name} seq-scans {table}: {plan}"
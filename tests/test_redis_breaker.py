@@ -0,0 +1,32 @@
+"""A half-open breaker lets exactly one trial call through."""
+import time
+
+from app.core.redis import CircuitBreaker
+
+
+def test_half_open_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    # The trial failed: open again, then a new trial after reset_seconds
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.001)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_released_trial_lets_the_next_one_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release_trial()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
@@ -0,0 +1,57 @@
+"""get_read_db sends reads to the replica, except within a writer's read-your-writes window.
+
+conftest points DATABASE_REPLICA_URL at the test database, so the replica
+engine is a second pool on the same database.
+"""
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.core import replica
+from app.core.cache import TTLCache
+
+WINDOW_SECONDS = 0.5
+
+
+@contextmanager
+def engines_used():
+    """Record which engine ran each SELECT on the tasks table."""
+    from database import async_engine, async_replica_engine
+
+    used = []
+    listeners = []
+    for name, engine in (("primary", async_engine), ("replica", async_replica_engine)):
+        def listener(conn, cursor, statement, parameters, context, executemany, name=name):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM tasks" in statement:
+                used.append(name)
+        event.listen(engine.sync_engine, "before_cursor_execute", listener)
+        listeners.append((engine.sync_engine, listener))
+    try:
+        yield used
+    finally:
+        for target, listener in listeners:
+            event.remove(target, "before_cursor_execute", listener)
+
+
+def test_reads_go_to_the_replica_outside_the_write_window(client, project_task, monkeypatch):
+    assert replica.replica_enabled()
+    monkeypatch.setattr(replica, "_recent_writers", TTLCache(100, WINDOW_SECONDS))
+    project, task = project_task["project"], project_task["task"]
+    headers = project_task["member_headers"]
+    report = f"/projects/{project.id}/report/overdue"
+
+    with engines_used() as used:
+        assert client.get(report, headers=headers).status_code == 200
+    assert used == ["replica"]
+
+    response = client.put(f"/tasks/{task.id}", json={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 200
+    with engines_used() as used:
+        assert client.get(report, headers=headers).status_code == 200
+    assert used == ["primary"]
+
+    time.sleep(WINDOW_SECONDS)
+    with engines_used() as used:
+        assert client.get(report, headers=headers).status_code == 200
+    assert used == ["replica"]
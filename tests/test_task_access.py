@@ -0,0 +1,64 @@
+"""get_task_for_user loads the task and checks project membership in one query.
+
+Each bound below is: at most one principal lookup (get_current_user, skipped
+when the principal cache is warm), one task + membership query, then the
+handler's own statements.
+"""
+import uuid
+
+from app.core.query_stats import assert_max_queries
+
+
+def test_get_task(client, project_task):
+    task = project_task["task"]
+    with assert_max_queries(2):
+        response = client.get(f"/tasks/{task.id}", headers=project_task["member_headers"])
+    assert response.status_code == 200
+    assert response.json()["title"] == task.title
+
+
+def test_update_task(client, project_task):
+    task = project_task["task"]
+    # + two counter upserts, the task UPDATE and the status notification
+    with assert_max_queries(6):
+        response = client.put(
+            f"/tasks/{task.id}", json={"status": "in_progress"}, headers=project_task["member_headers"],
+        )
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+
+
+def test_task_comments(client, project_task):
+    task = project_task["task"]
+    headers = project_task["member_headers"]
+    with assert_max_queries(3):
+        response = client.post(f"/tasks/{task.id}/comments/", json={"content": "Looks good"}, headers=headers)
+    assert response.status_code == 201
+
+    with assert_max_queries(3):
+        response = client.get(f"/tasks/{task.id}/comments/", headers=headers)
+    assert response.status_code == 200
+    assert [comment["content"] for comment in response.json()["items"]] == ["Looks good"]
+
+
+def test_task_attachments(client, project_task):
+    task = project_task["task"]
+    with assert_max_queries(3):
+        response = client.get(f"/tasks/{task.id}/attachments/", headers=project_task["member_headers"])
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+def test_missing_task_is_404(client, project_task):
+    with assert_max_queries(2):
+        response = client.get(f"/tasks/{uuid.uuid4()}", headers=project_task["member_headers"])
+    assert response.status_code == 404
+
+
+def test_non_member_is_403(client, project_task):
+    task = project_task["task"]
+    headers = project_task["outsider_headers"]
+    for path in (f"/tasks/{task.id}", f"/tasks/{task.id}/comments/", f"/tasks/{task.id}/attachments/"):
+        with assert_max_queries(2):
+            response = client.get(path, headers=headers)
+        assert response.status_code == 403, path